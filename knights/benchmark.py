@@ -0,0 +1,111 @@
+import csv
+import sys
+import time
+
+from dpll import count_models
+from generate import puzzle
+from logic import KnowledgeBase, model_check
+
+# model_check backends, and KnowledgeBase backends answering all at once
+BACKENDS = ["enumerate", "compiled", "bitwise", "parallel", "dpll",
+            "resolution", "forward", "kb:enumerate", "kb:bitwise", "kb:dpll"]
+SIZES = [2, 4, 6, 8, 10, 12, 15, 20, 25, 30]
+
+# Nesting depth of the characters' statements
+DEPTH = 2
+
+# Backends expected to take longer than this many seconds are skipped
+BUDGET = 10
+
+# Backends whose running time doubles with every symbol added
+ENUMERATING = {"enumerate", "compiled", "bitwise", "parallel",
+               "kb:enumerate", "kb:bitwise"}
+
+
+def run(backend, knowledge, queries):
+    """
+    Returns how many queries are entailed by knowledge, using `backend`.
+    """
+    if backend.startswith("kb:"):
+        base = KnowledgeBase(knowledge, backend=backend[3:])
+        return sum(base.entails_all(queries))
+    return sum(model_check(knowledge, query, backend) for query in queries)
+
+
+def benchmark(n, backends, depth=DEPTH, seed=0):
+    """
+    Generates a puzzle with `n` characters and times, for each backend,
+    checking whether every knight and knave symbol is entailed.
+
+    Returns the number of symbols, the number of models of the
+    knowledge base, and a dictionary mapping each backend to its
+    elapsed seconds and the number of entailed symbols (or None, if
+    the puzzle is too large for the backend).
+    """
+    knowledge, symbols = puzzle(n, depth=depth, seed=seed)
+    queries = [symbol for pair in symbols.values() for symbol in pair]
+
+    results = dict()
+    for backend in backends:
+        start = time.perf_counter()
+        try:
+            entailed = run(backend, knowledge, queries)
+        except ValueError:
+            results[backend] = None
+            continue
+        results[backend] = (time.perf_counter() - start, entailed)
+    return len(knowledge.symbols()), count_models(knowledge), results
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [results.csv]")
+
+    rows = []
+    backends = BACKENDS.copy()
+
+    # Why each backend left out of larger puzzles stopped, and where
+    stopped = dict()
+    print(f"{'characters':>10} {'symbols':>8} {'models':>10} {'sat':>6}  "
+          + "".join(f"{backend:>14}" for backend in BACKENDS))
+    for i, n in enumerate(SIZES):
+        symbols, models, results = benchmark(n, backends, seed=n)
+        cells = []
+        for backend in BACKENDS:
+            result = results.get(backend)
+            if result is None:
+                cells.append(f"{'-':>14}")
+                if backend in backends:
+                    backends.remove(backend)
+                    stopped[backend] = f"too many symbols from {n} characters"
+                continue
+            seconds, entailed = result
+            cells.append(f"{seconds:>13.3f}s")
+            rows.append([n, symbols, 2 ** symbols, models, backend,
+                         seconds, entailed])
+
+            # Leave slow backends out of larger puzzles
+            if backend in ENUMERATING and i + 1 < len(SIZES):
+                seconds *= 2 ** (2 * (SIZES[i + 1] - n))
+            if seconds > BUDGET and i + 1 < len(SIZES):
+                backends.remove(backend)
+                stopped[backend] = (f"over {BUDGET}s expected from "
+                                    f"{SIZES[i + 1]} characters")
+        print(f"{n:>10} {symbols:>8} {2 ** symbols:>10.3g} {models:>6}  "
+              + "".join(cells))
+
+    print()
+    for backend, reason in stopped.items():
+        print(f"{backend}: {reason}")
+
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["characters", "symbols", "models",
+                             "satisfying models", "backend", "seconds",
+                             "entailed"])
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
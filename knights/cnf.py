@@ -0,0 +1,208 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Conjunctive normal form of logical sentences, built with the
+    Tseitin encoding.
+
+    Each symbol is mapped to a positive integer variable and every
+    compound subsentence gets a fresh variable that is constrained to
+    be equivalent to it, so the number of clauses grows linearly with
+    the size of the sentence (instead of exponentially, as with the
+    distribution of ∨ over ∧).
+
+    Clauses are lists of non-zero integers: `v` stands for a variable
+    being true and `-v` for it being false.
+    """
+
+    def __init__(self):
+
+        # Map symbol names to variables and variables back to names
+        self.variables = dict()
+        self.names = dict()
+
+        # Number of variables allocated so far (symbols and auxiliary)
+        self.count = 0
+
+        # Clauses generated so far, and literals of encoded subsentences
+        self.clauses = []
+        self.literals = dict()
+
+    def variable(self, name):
+        """
+        Returns the variable of symbol `name`, allocating it if needed.
+        """
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+            self.names[self.count] = name
+        return self.variables[name]
+
+    def fresh(self):
+        """
+        Allocates an auxiliary variable standing for a subsentence.
+        """
+        self.count += 1
+        return self.count
+
+    def encode(self, sentence):
+        """
+        Returns a literal that is equivalent to `sentence`, adding the
+        clauses that define it. Identical subsentences share a literal.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            children = [self.encode(child) for child in sentence.conjuncts]
+            literal = self.fresh()
+
+            # literal => each conjunct, and all conjuncts => literal
+            for child in children:
+                self.clauses.append([-literal, child])
+            self.clauses.append([literal] + [-child for child in children])
+
+        elif isinstance(sentence, Or):
+            children = [self.encode(child) for child in sentence.disjuncts]
+            literal = self.fresh()
+
+            # each disjunct => literal, and literal => some disjunct
+            for child in children:
+                self.clauses.append([literal, -child])
+            self.clauses.append([-literal] + children)
+
+        elif isinstance(sentence, Implication):
+            antecedent = self.encode(sentence.antecedent)
+            consequent = self.encode(sentence.consequent)
+            literal = self.fresh()
+            self.clauses.append([-literal, -antecedent, consequent])
+            self.clauses.append([literal, antecedent])
+            self.clauses.append([literal, -consequent])
+
+        elif isinstance(sentence, Biconditional):
+            left = self.encode(sentence.left)
+            right = self.encode(sentence.right)
+            literal = self.fresh()
+            self.clauses.append([-literal, -left, right])
+            self.clauses.append([-literal, left, -right])
+            self.clauses.append([literal, left, right])
+            self.clauses.append([literal, -left, -right])
+
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def add(self, sentence):
+        """
+        Asserts `sentence`, returning the clauses added for it.
+        Top level conjunctions and disjunctions are asserted directly,
+        without an auxiliary variable for the whole sentence.
+        """
+        start = len(self.clauses)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.encode(disjunct) for disjunct in sentence.disjuncts]
+            )
+        else:
+            self.clauses.append([self.encode(sentence)])
+        return self.clauses[start:]
+
+    def clausify(self, sentence, positive=True, limit=None):
+        """
+        Returns the clauses of `sentence` (or of its negation, if
+        `positive` is False) over symbol variables only, distributing
+        ∨ over ∧. The result can be exponentially larger than the
+        sentence, but keeps its Horn structure visible; with a `limit`,
+        None is returned as soon as more clauses than that could arise.
+        """
+        if isinstance(sentence, Symbol):
+            variable = self.variable(sentence.name)
+            return [[variable if positive else -variable]]
+        if isinstance(sentence, Not):
+            return self.clausify(sentence.operand, not positive, limit)
+
+        # Rewrite the sentence as a conjunction or disjunction of parts
+        if isinstance(sentence, And):
+            parts = [(conjunct, positive) for conjunct in sentence.conjuncts]
+            conjunction = positive
+        elif isinstance(sentence, Or):
+            parts = [(disjunct, positive) for disjunct in sentence.disjuncts]
+            conjunction = not positive
+        elif isinstance(sentence, Implication):
+            parts = [(sentence.antecedent, not positive),
+                     (sentence.consequent, positive)]
+            conjunction = not positive
+        elif isinstance(sentence, Biconditional):
+            left, right = sentence.left, sentence.right
+            if positive:
+                parts = [Or(Not(left), right), Or(left, Not(right))]
+            else:
+                parts = [Or(left, right), Or(Not(left), Not(right))]
+            parts = [(part, True) for part in parts]
+            conjunction = True
+        else:
+            raise TypeError("must be a logical sentence")
+
+        if conjunction:
+            clauses = []
+            for part, polarity in parts:
+                more = self.clausify(part, polarity, limit)
+                if more is None:
+                    return None
+                clauses.extend(more)
+                if limit is not None and len(clauses) > limit:
+                    return None
+            return clauses
+
+        # Distribute the disjunction over the clauses of each part
+        clauses = [[]]
+        for part, polarity in parts:
+            rights = self.clausify(part, polarity, limit)
+            if rights is None or (
+                limit is not None and len(clauses) * len(rights) > limit
+            ):
+                return None
+            clauses = [
+                left + [literal for literal in right if literal not in left]
+                for left in clauses
+                for right in rights
+                if not any(-literal in left for literal in right)
+            ]
+        return clauses
+
+    def add_clausified(self, sentence, limit=32):
+        """
+        Asserts `sentence` like `add`, but each top level conjunct is
+        added as its own clauses over symbols when it has at most
+        `limit` of them, falling back to the Tseitin encoding otherwise.
+        """
+        start = len(self.clauses)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add_clausified(conjunct, limit)
+        else:
+            clauses = self.clausify(sentence, limit=limit)
+            if clauses is not None:
+                self.clauses.extend(clauses)
+            else:
+                self.add(sentence)
+        return self.clauses[start:]
+
+    def model(self, assignment):
+        """
+        Translates a variable assignment into a model over symbol names.
+        """
+        return {
+            name: assignment.get(variable, False)
+            for name, variable in self.variables.items()
+        }
@@ -0,0 +1,198 @@
+import itertools
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Largest number of symbols evaluated at once as truth table bit vectors
+# (each column of 22 symbols takes 2^22 bits, 512 KiB)
+MAX_BITWISE_SYMBOLS = 22
+
+
+def operands(sentence):
+    """Returns the sentences `sentence` is built from."""
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    return []
+
+
+def shared(sentence):
+    """
+    Returns the compound subsentences that appear more than once in
+    `sentence` (the same object, as interning makes equal subtrees),
+    each after the ones it contains.
+    """
+    uses = dict()
+    order = []
+
+    def visit(node):
+        if id(node) in uses:
+            uses[id(node)] += 1
+            return
+        uses[id(node)] = 1
+        for operand in operands(node):
+            visit(operand)
+        order.append(node)
+
+    visit(sentence)
+    return [node for node in order
+            if uses[id(node)] > 1 and not isinstance(node, Symbol)]
+
+
+def expression(sentence, index, bitwise=False, names=None):
+    """
+    Returns Python source for `sentence`, where symbol `name` is read
+    from `m[index[name]]`.
+
+    If `bitwise` is True, the source operates on integers used as bit
+    vectors (one bit per model), with `M` holding the all-ones mask.
+    Subsentences in `names` (by id) are read from the local variables
+    named there.
+    """
+    if names and id(sentence) in names:
+        return names[id(sentence)]
+
+    if isinstance(sentence, Symbol):
+        return f"m[{index[sentence.name]}]"
+
+    if isinstance(sentence, Not):
+        operand = expression(sentence.operand, index, bitwise, names)
+        return f"(M ^ {operand})" if bitwise else f"(not {operand})"
+
+    if isinstance(sentence, And):
+        if not sentence.conjuncts:
+            return "M" if bitwise else "True"
+        operator = " & " if bitwise else " and "
+        return "(" + operator.join(
+            expression(conjunct, index, bitwise, names)
+            for conjunct in sentence.conjuncts
+        ) + ")"
+
+    if isinstance(sentence, Or):
+        if not sentence.disjuncts:
+            return "0" if bitwise else "False"
+        operator = " | " if bitwise else " or "
+        return "(" + operator.join(
+            expression(disjunct, index, bitwise, names)
+            for disjunct in sentence.disjuncts
+        ) + ")"
+
+    if isinstance(sentence, Implication):
+        antecedent = expression(sentence.antecedent, index, bitwise, names)
+        consequent = expression(sentence.consequent, index, bitwise, names)
+        if bitwise:
+            return f"((M ^ {antecedent}) | {consequent})"
+        return f"((not {antecedent}) or {consequent})"
+
+    if isinstance(sentence, Biconditional):
+        left = expression(sentence.left, index, bitwise, names)
+        right = expression(sentence.right, index, bitwise, names)
+        if bitwise:
+            return f"(M ^ {left} ^ {right})"
+        return f"(bool({left}) == bool({right}))"
+
+    raise TypeError("must be a logical sentence")
+
+
+def function(sentence, index, bitwise=False):
+    """
+    Compiles `sentence` into a function of `m` (and `M`, if `bitwise`)
+    returning its value. Shared subsentences are computed once, into
+    local variables, so the source grows with the number of distinct
+    subsentences rather than with the size of the expanded tree.
+    """
+    names = dict()
+    lines = []
+    for node in shared(sentence):
+        value = expression(node, index, bitwise, names)
+        names[id(node)] = f"t{len(names)}"
+        lines.append(f"    {names[id(node)]} = {value}\n")
+    result = expression(sentence, index, bitwise, names)
+    if not bitwise:
+        result = f"bool({result})"
+    arguments = "m, M" if bitwise else "m"
+    namespace = dict()
+    exec(f"def f({arguments}):\n{''.join(lines)}    return {result}\n",
+         namespace)
+    return namespace["f"]
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Compiles `sentence` into a function of a single argument: a tuple
+    of booleans, with one value for each name in `symbols` (in order).
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    return function(sentence, index)
+
+
+def columns(n):
+    """
+    Returns the truth table columns of `n` symbols: integers whose bit
+    `k` is set when symbol `i` is true in model `k`, i.e. when bit `i`
+    of `k` is set.
+    """
+    if n > MAX_BITWISE_SYMBOLS:
+        raise ValueError(f"too many symbols for a truth table ({n})")
+    size = 1 << n
+    result = []
+    for i in range(n):
+        width = 1 << i
+        column = ((1 << width) - 1) << width
+        length = width << 1
+        while length < size:
+            column |= column << length
+            length <<= 1
+        result.append(column)
+    return result
+
+
+def truth_table(sentence, symbols, table=None):
+    """
+    Evaluates `sentence` in all 2^n models of `symbols` at once,
+    returning an integer whose bit `k` is the value in model `k`.
+
+    `table` may hold the precomputed `columns(len(symbols))`.
+    """
+    if len(symbols) > MAX_BITWISE_SYMBOLS:
+        raise ValueError(
+            f"too many symbols for a truth table ({len(symbols)})"
+        )
+    if table is None:
+        table = columns(len(symbols))
+    index = {name: i for i, name in enumerate(symbols)}
+    evaluate = function(sentence, index, bitwise=True)
+    return evaluate(table, (1 << (1 << len(symbols))) - 1)
+
+
+def compiled_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, enumerating every model
+    with compiled sentences and stopping at the first counter-model.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    knowledge = compile_sentence(knowledge, symbols)
+    query = compile_sentence(query, symbols)
+    for model in itertools.product((False, True), repeat=len(symbols)):
+        if knowledge(model) and not query(model):
+            return False
+    return True
+
+
+def bitwise_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, evaluating both sentences
+    in all models at once as truth table bit vectors.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    table = columns(len(symbols))
+    mask = (1 << (1 << len(symbols))) - 1
+    knowledge = truth_table(knowledge, symbols, table)
+    query = truth_table(query, symbols, table)
+    return knowledge & (mask ^ query) == 0
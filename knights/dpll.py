@@ -0,0 +1,229 @@
+from cnf import CNF
+from logic import Not
+
+
+class Solver():
+    """
+    DPLL satisfiability solver over integer clauses.
+
+    Unit propagation uses two watched literals per clause: a clause is
+    only visited when one of its two watched literals becomes false,
+    and assignments never need to be undone in the watch lists when
+    backtracking.
+    """
+
+    def __init__(self, clauses=()):
+
+        # Clauses with at least two literals, watched at positions 0 and 1
+        self.clauses = []
+        self.watches = dict()
+
+        # Current assignment (variable -> bool) and the order it was made
+        self.assignment = dict()
+        self.trail = []
+
+        # Each decision level: trail position, decision and if it was flipped
+        self.levels = []
+
+        # Position of the next trail literal to propagate
+        self.head = 0
+
+        # Set when the clauses are unsatisfiable regardless of assumptions
+        self.conflict = False
+
+        # Variables seen, ordered by number of occurrences when deciding
+        self.occurrences = dict()
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        """
+        Returns True or False if `literal` is assigned, None otherwise.
+        """
+        value = self.assignment.get(abs(literal))
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def assign(self, literal):
+        self.assignment[abs(literal)] = literal > 0
+        self.trail.append(literal)
+
+    def add_clause(self, clause):
+        """
+        Adds a clause to the solver. Must not be called while solving.
+        """
+        self.backtrack(0)
+
+        # Drop repeated and false literals, and skip satisfied clauses
+        literals = []
+        for literal in clause:
+            self.occurrences[abs(literal)] = (
+                self.occurrences.get(abs(literal), 0) + 1
+            )
+            if -literal in literals or self.value(literal) is True:
+                return
+            if literal not in literals and self.value(literal) is None:
+                literals.append(literal)
+
+        if not literals:
+            self.conflict = True
+        elif len(literals) == 1:
+            self.assign(literals[0])
+            if not self.propagate():
+                self.conflict = True
+        else:
+            self.clauses.append(literals)
+            for literal in literals[:2]:
+                self.watches.setdefault(literal, []).append(literals)
+
+    def propagate(self):
+        """
+        Propagates unit clauses from the pending trail literals.
+        Returns False if a clause became false.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for index, clause in enumerate(watching):
+
+                # Keep the false literal at position 1
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                # Clause already satisfied by the other watch
+                other = self.value(clause[0])
+                if other is True:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+
+                    # Every other literal is false: conflict or unit clause
+                    if other is False:
+                        kept.extend(watching[index + 1:])
+                        self.watches[false] = kept
+                        return False
+                    self.assign(clause[0])
+
+            self.watches[false] = kept
+        return True
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment made above decision level `level`.
+        """
+        if len(self.levels) <= level:
+            return
+        position = self.levels[level][0]
+        for literal in self.trail[position:]:
+            del self.assignment[abs(literal)]
+        del self.trail[position:]
+        del self.levels[level:]
+        self.head = len(self.trail)
+
+    def decide(self, literal, flipped):
+        self.levels.append((len(self.trail), literal, flipped))
+        self.assign(literal)
+
+    def solve(self, assumptions=()):
+        """
+        Returns a satisfying assignment (variable -> bool) extending
+        `assumptions`, or None if there is none.
+        """
+        self.backtrack(0)
+        if self.conflict:
+            return None
+
+        # Assumptions are decisions that can never be flipped
+        for literal in assumptions:
+            value = self.value(literal)
+            if value is False:
+                self.backtrack(0)
+                return None
+            if value is None:
+                self.decide(literal, True)
+                if not self.propagate():
+                    self.backtrack(0)
+                    return None
+
+        order = sorted(self.occurrences, key=self.occurrences.get,
+                       reverse=True)
+        while True:
+
+            # Choose the most frequent unassigned variable
+            variable = next(
+                (v for v in order if v not in self.assignment), None
+            )
+            if variable is None:
+                model = dict(self.assignment)
+                self.backtrack(0)
+                return model
+            self.decide(-variable, False)
+
+            # On conflict, flip the most recent unflipped decision
+            while not self.propagate():
+                while self.levels and self.levels[-1][2]:
+                    self.backtrack(len(self.levels) - 1)
+                if not self.levels:
+                    self.backtrack(0)
+                    return None
+                literal = self.levels[-1][1]
+                self.backtrack(len(self.levels) - 1)
+                self.decide(-literal, True)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model (symbol name -> bool) satisfying `sentence`,
+    or None if the sentence is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    assignment = Solver(cnf.clauses).solve()
+    return None if assignment is None else cnf.model(assignment)
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking that
+    knowledge ∧ ¬query has no model.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return Solver(cnf.clauses).solve() is None
+
+
+def count_models(sentence, limit=None):
+    """
+    Returns the number of models of `sentence` over its symbols,
+    blocking each model found until no more exist (or `limit` is hit).
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    for name in sentence.symbols():
+        cnf.variable(name)
+    solver = Solver(cnf.clauses)
+    variables = list(cnf.variables.values())
+    count = 0
+    while limit is None or count < limit:
+        assignment = solver.solve()
+        if assignment is None:
+            break
+        count += 1
+        solver.add_clause([
+            -variable if assignment.get(variable, False) else variable
+            for variable in variables
+        ])
+    return count
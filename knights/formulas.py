@@ -0,0 +1,296 @@
+import json
+import re
+import sys
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Operators (with ASCII alternatives) and their precedence
+OPERATORS = {
+    "¬": "¬", "~": "¬", "!": "¬",
+    "∧": "∧", "&": "∧",
+    "∨": "∨", "|": "∨",
+    "=>": "=>",
+    "<=>": "<=>"
+}
+PRECEDENCE = {"¬": 5, "∧": 4, "∨": 3, "=>": 2, "<=>": 1}
+
+# Operators, parentheses, or symbol names (runs of any other characters,
+# where <, = and > are allowed as long as they do not form => or <=>)
+TOKEN = re.compile(
+    r"\s*(?:(<=>|=>|[¬~!∧&∨|])|([()])|"
+    r"((?:(?!<=>|=>)[^()¬~!∧&∨|\s])(?:(?!<=>|=>)[^()¬~!∧&∨|])*))"
+)
+
+# Codes of the node classes in the encoding of `encode`
+CODES = {Symbol: 0, Not: 1, And: 2, Or: 3, Implication: 4, Biconditional: 5}
+CLASSES = {code: cls for cls, code in CODES.items()}
+
+
+def parse(text):
+    """
+    Parses a formula written as `Sentence.formula()` does, e.g.
+    "(A is a Knight) => ¬(B is a Knight ∧ C)", into a sentence.
+    ∧ and ∨ chains become a single And or Or; an empty formula is
+    an empty And.
+    """
+    output = []
+
+    # Pending operators as [operator, number of operands]
+    operators = []
+
+    def reduce():
+        operator, count = operators.pop()
+        if operator == "¬":
+            output.append(Not(output.pop()))
+            return
+        operands = output[-count:]
+        del output[-count:]
+        if operator == "∧":
+            output.append(And(*operands))
+        elif operator == "∨":
+            output.append(Or(*operands))
+        elif operator == "=>":
+            output.append(Implication(*operands))
+        else:
+            output.append(Biconditional(*operands))
+
+    position = 0
+    expect_operand = True
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"invalid formula at character {position}")
+        position = match.end()
+        operator, parenthesis, name = match.groups()
+
+        if name is not None:
+            if not expect_operand:
+                raise ValueError(f"unexpected symbol {name.strip()}")
+            output.append(Symbol(name.strip()))
+            expect_operand = False
+
+        elif parenthesis == "(":
+            if not expect_operand:
+                raise ValueError("unexpected (")
+            operators.append(["(", 0])
+
+        elif parenthesis == ")":
+            if expect_operand:
+                raise ValueError("unexpected )")
+            while operators and operators[-1][0] != "(":
+                reduce()
+            if not operators:
+                raise ValueError("unbalanced parentheses")
+            operators.pop()
+
+        elif OPERATORS[operator] == "¬":
+            if not expect_operand:
+                raise ValueError("unexpected ¬")
+            operators.append(["¬", 1])
+
+        else:
+            operator = OPERATORS[operator]
+            if expect_operand:
+                raise ValueError(f"unexpected {operator}")
+
+            # Reduce tighter operators (and equal ones, except => which
+            # groups to the right), merging ∧ and ∨ chains
+            while operators and operators[-1][0] != "(":
+                top = operators[-1][0]
+                if PRECEDENCE[top] < PRECEDENCE[operator]:
+                    break
+                if top == operator and operator in ("∧", "∨", "=>"):
+                    break
+                reduce()
+            if operators and operators[-1][0] == operator != "=>":
+                operators[-1][1] += 1
+            else:
+                operators.append([operator, 2])
+            expect_operand = True
+
+    if not output and not operators:
+        return And()
+    if expect_operand:
+        raise ValueError("formula ends with an operator")
+    while operators:
+        if operators[-1][0] == "(":
+            raise ValueError("unbalanced parentheses")
+        reduce()
+    return output[0]
+
+
+def parse_file(path):
+    """
+    Parses a file with one formula per line, returning the conjunction
+    of all of them as a knowledge base.
+    """
+    knowledge = And()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                knowledge.add(parse(line))
+    return knowledge
+
+
+def to_text(knowledge):
+    """
+    Writes a knowledge base as `parse_file` reads it, one formula per
+    conjunct. Raises ValueError if a symbol name would not parse back:
+    names cannot hold parentheses, the operators ¬ ~ ! ∧ & ∨ | => and
+    <=>, or start or end with spaces.
+    """
+    for name in knowledge.symbols():
+        match = TOKEN.fullmatch(name)
+        if match is None or match.group(3) != name:
+            raise ValueError(f"symbol name {name!r} cannot be parsed")
+    conjuncts = (knowledge.conjuncts if isinstance(knowledge, And)
+                 else [knowledge])
+    return "\n".join(conjunct.formula() for conjunct in conjuncts)
+
+
+def nodes(sentence):
+    """
+    Returns the distinct subsentences of `sentence` in an order where
+    operands come before the sentences that use them.
+    """
+    order = []
+    seen = set()
+    stack = [(sentence, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in seen:
+            continue
+        if expanded or isinstance(node, Symbol):
+            seen.add(id(node))
+            order.append(node)
+            continue
+        stack.append((node, True))
+        stack.extend((operand, False) for operand in reversed(operands(node)))
+    return order
+
+
+def operands(sentence):
+    """
+    Returns the list of operands of a sentence.
+    """
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return list(sentence.conjuncts)
+    if isinstance(sentence, Or):
+        return list(sentence.disjuncts)
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    return []
+
+
+def encode(sentence):
+    """
+    Flattens `sentence` into a list of symbol names and a list of
+    integer codes: for each distinct subsentence, its class code, its
+    number of operands, and the indices of its operands (or of its name,
+    for symbols). Shared subsentences are stored once; the last node is
+    the sentence itself.
+    """
+    names = []
+    codes = []
+    index = dict()
+    for i, node in enumerate(nodes(sentence)):
+        index[id(node)] = i
+        if isinstance(node, Symbol):
+            codes.extend((CODES[Symbol], 1, len(names)))
+            names.append(node.name)
+        else:
+            children = operands(node)
+            codes.append(CODES[type(node)])
+            codes.append(len(children))
+            codes.extend(index[id(child)] for child in children)
+    return names, codes
+
+
+def decode(names, codes):
+    """
+    Rebuilds a sentence from the output of `encode`.
+    """
+    built = []
+    position = 0
+    while position < len(codes):
+        cls = CLASSES[codes[position]]
+        count = codes[position + 1]
+        arguments = codes[position + 2:position + 2 + count]
+        position += 2 + count
+        if cls is Symbol:
+            built.append(Symbol(names[arguments[0]]))
+        else:
+            built.append(cls(*[built[i] for i in arguments]))
+    if not built:
+        raise ValueError("no sentence to decode")
+    return built[-1]
+
+
+def to_json(sentence):
+    """Serializes a sentence as compact JSON."""
+    names, codes = encode(sentence)
+    return json.dumps({"symbols": names, "nodes": codes},
+                      ensure_ascii=False, separators=(",", ":"))
+
+
+def from_json(text):
+    """Rebuilds a sentence serialized by `to_json`."""
+    data = json.loads(text)
+    return decode(data["symbols"], data["nodes"])
+
+
+def save(sentence, path):
+    """Writes a sentence to `path` as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_json(sentence))
+
+
+def load(path):
+    """
+    Reads a sentence from `path`: JSON (see `to_json`), or one formula
+    per line.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = f.read()
+    if data.lstrip().startswith("{"):
+        return from_json(data)
+    return parse_file(path)
+
+
+def main():
+    """
+    Measures parsing and loading throughput on a generated knowledge
+    base with `n` characters (python formulas.py [n]).
+    """
+    from generate import puzzle
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    knowledge, _ = puzzle(n, depth=3, seed=0)
+    text = to_text(knowledge)
+    size = len(text.encode("utf-8")) / 1e6
+
+    start = time.perf_counter()
+    parsed = And(*[parse(line) for line in text.split("\n")])
+    seconds = time.perf_counter() - start
+    print(f"Parsed {size:.1f} MB of formulas in {seconds:.2f}s "
+          f"({size / seconds:.1f} MB/s)")
+    if parsed != knowledge:
+        sys.exit("Parsed knowledge base differs from the original")
+
+    data = to_json(knowledge)
+    start = time.perf_counter()
+    loaded = from_json(data)
+    seconds = time.perf_counter() - start
+    print(f"Loaded {len(data) / 1e6:.1f} MB of JSON in {seconds:.2f}s")
+    if loaded != knowledge:
+        sys.exit("JSON knowledge base differs from the original")
+
+
+if __name__ == "__main__":
+    main()
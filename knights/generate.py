@@ -0,0 +1,74 @@
+import random
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def characters(n):
+    """
+    Returns the names of `n` characters: A, B, ..., Z, A1, B1, ...
+    """
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [
+        letters[i % 26] + (str(i // 26) if i >= 26 else "")
+        for i in range(n)
+    ]
+
+
+def statement(rng, pairs, depth):
+    """
+    Returns a random statement about the characters whose
+    `(knight, knave)` symbols are in `pairs`, nesting connectives up
+    to `depth` levels deep.
+    """
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(pairs)[rng.randrange(2)]
+    connective = rng.choice([Not, And, Or, Implication, Biconditional])
+    if connective is Not:
+        return Not(statement(rng, pairs, depth - 1))
+    return connective(
+        statement(rng, pairs, depth - 1),
+        statement(rng, pairs, depth - 1)
+    )
+
+
+def puzzle(n, depth=2, seed=None):
+    """
+    Generates a knights and knaves puzzle with `n` characters, where
+    each character makes a random statement about the characters
+    (possibly including itself), with connectives nested up to `depth`
+    levels deep.
+
+    Returns the knowledge base and a dictionary mapping each character
+    to its pair of symbols `(knight, knave)`. Statements are chosen to
+    be consistent with a hidden assignment of knights and knaves, so
+    the knowledge base is always satisfiable.
+    """
+    rng = random.Random(seed)
+    names = characters(n)
+    symbols = {
+        name: (Symbol(f"{name} is a Knight"), Symbol(f"{name} is a Knave"))
+        for name in names
+    }
+    pairs = list(symbols.values())
+    knight = {name: rng.random() < 0.5 for name in names}
+    model = dict()
+    for name in names:
+        model[symbols[name][0].name] = knight[name]
+        model[symbols[name][1].name] = not knight[name]
+
+    knowledge = And()
+    for name in names:
+        is_knight, is_knave = symbols[name]
+
+        # Game rule: each character is either a knight or a knave
+        knowledge.add(Or(is_knight, is_knave))
+        knowledge.add(Not(And(is_knight, is_knave)))
+
+        # Knights say true statements and knaves false ones
+        said = statement(rng, pairs, depth)
+        if said.evaluate(model) != knight[name]:
+            said = Not(said)
+        knowledge.add(Implication(is_knight, said))
+        knowledge.add(Implication(is_knave, Not(said)))
+
+    return knowledge, symbols
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+
+from cnf import CNF
+from dpll import Solver
+from logic import Symbol
+
+# Resolvents derived (kept or not) before resolution hands a query
+# over to DPLL
+BUDGET = 20000
+
+
+def resolution(knowledge, query, budget=BUDGET):
+    """
+    Checks if knowledge base entails query by resolution refutation:
+    knowledge ∧ ¬query is unsatisfiable if resolving its clauses
+    derives the empty clause.
+
+    Only resolvents with at least one parent derived from ¬query are
+    generated (set of support), shortest clauses first, and clauses
+    subsumed by other clauses are discarded. The set of support
+    restriction is only complete if the knowledge base itself is
+    satisfiable. So when no refutation is found, or none within
+    `budget` resolvents, knowledge ∧ ¬query is left to DPLL.
+    """
+    cnf = CNF()
+    cnf.add_clausified(knowledge)
+    negation = cnf.clausify(query, positive=False, limit=32)
+    if negation is None:
+        negation = [[-cnf.encode(query)]]
+
+    # Clauses available as resolution partners, indexed by literal
+    usable = dict()
+
+    # Every kept clause indexed by literal, and by its smallest literal
+    kept = dict()
+    smallest = dict()
+
+    # Set of support as a heap of (size, order, clause)
+    support = []
+    order = itertools.count()
+
+    def keep(clause, index):
+        for literal in clause:
+            index.setdefault(literal, set()).add(clause)
+
+    def discard(clause, index):
+        for literal in clause:
+            index.get(literal, set()).discard(clause)
+
+    def add(clause):
+        keep(clause, kept)
+        smallest.setdefault(min(clause), set()).add(clause)
+
+    def subsumed(clause):
+        """Checks if a kept clause is a subset of `clause`."""
+        return any(
+            other <= clause
+            for literal in clause
+            for other in smallest.get(literal, ())
+        )
+
+    def subsume(clause):
+        """Discards every kept clause that is a superset of `clause`."""
+        literal = min(clause, key=lambda l: len(kept.get(l, ())))
+        for other in list(kept.get(literal, ())):
+            if clause <= other:
+                discard(other, kept)
+                discard(other, usable)
+                smallest[min(other)].discard(other)
+
+    # Knowledge clauses (and query definitions) are usable from the start
+    for clause in sorted(map(frozenset, cnf.clauses), key=len):
+        if not clause:
+            return True
+        if any(-literal in clause for literal in clause) or subsumed(clause):
+            continue
+        subsume(clause)
+        add(clause)
+        keep(clause, usable)
+
+    for clause in map(frozenset, negation):
+        if not clause:
+            return True
+        if any(-literal in clause for literal in clause) or subsumed(clause):
+            continue
+        subsume(clause)
+        add(clause)
+        heapq.heappush(support, (len(clause), next(order), clause))
+
+    derived = 0
+    while support and derived < budget:
+        _, _, given = heapq.heappop(support)
+
+        # Skip clauses subsumed since they were added
+        if given not in kept.get(next(iter(given)), ()):
+            continue
+        keep(given, usable)
+
+        for literal in given:
+            for other in list(usable.get(-literal, ())):
+                resolvent = (given - {literal}) | (other - {-literal})
+                derived += 1
+                if not resolvent:
+                    return True
+                if any(-l in resolvent for l in resolvent):
+                    continue
+                if subsumed(resolvent):
+                    continue
+                subsume(resolvent)
+                add(resolvent)
+                heapq.heappush(
+                    support, (len(resolvent), next(order), resolvent)
+                )
+            if given not in kept.get(literal, ()):
+                break
+
+    # An unsatisfiable knowledge base entails every query, and clauses
+    # left in the set of support may still lead to a refutation
+    return Solver(cnf.clauses + [list(clause) for clause in negation]
+                  ).solve() is None
+
+
+def forward_chaining(knowledge, query):
+    """
+    Checks if knowledge base entails query by forward chaining over its
+    Horn clauses (clauses with at most one positive literal).
+
+    Facts derived from the Horn subset of the knowledge base are always
+    entailed. If the whole knowledge base is Horn and query is a symbol,
+    failing to derive it also proves it is not entailed; otherwise the
+    query is settled by resolution.
+    """
+    cnf = CNF()
+    clauses = cnf.add_clausified(knowledge)
+    horn = [clause for clause in clauses
+            if sum(literal > 0 for literal in clause) <= 1]
+
+    # Conclusion (0 standing for false) and unproven premises of each rule
+    conclusion = []
+    missing = []
+    rules = dict()
+    agenda = []
+    for clause in horn:
+        positive = [literal for literal in clause if literal > 0]
+        premises = {-literal for literal in clause if literal < 0}
+        conclusion.append(positive[0] if positive else 0)
+        missing.append(len(premises))
+        if not premises:
+            agenda.append(conclusion[-1])
+        for premise in premises:
+            rules.setdefault(premise, []).append(len(conclusion) - 1)
+
+    goals = None
+    if isinstance(query, Symbol):
+        goals = {cnf.variable(query.name)}
+
+    inferred = set()
+    while agenda:
+        fact = agenda.pop()
+
+        # Deriving false means the knowledge base is unsatisfiable
+        if fact == 0 or (goals is not None and fact in goals):
+            return True
+        if fact in inferred:
+            continue
+        inferred.add(fact)
+        for rule in rules.get(fact, ()):
+            missing[rule] -= 1
+            if missing[rule] == 0:
+                agenda.append(conclusion[rule])
+
+    if goals is not None and len(horn) == len(clauses):
+        return False
+    return resolution(knowledge, query)
@@ -1,8 +1,18 @@
 import itertools
+import weakref
 
 
 class Sentence():
 
+    # Live immutable sentences, so that identical subtrees are shared
+    interned = weakref.WeakValueDictionary()
+
+    # Whether the sentence can never change, so that its symbols and
+    # hash are cached: only sentences with an And in them can, since
+    # conjunctions grow through `add`
+    frozen = True
+    _symbols = frozenset()
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -12,14 +22,48 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return self._symbols if self.frozen else self.collect()
+
+    def __hash__(self):
+        return self._hash if self.frozen else self.digest()
+
+    def collect(self):
+        """Computes the symbols of the sentence from its operands."""
+        return frozenset()
+
+    def digest(self):
+        """Computes the hash of the sentence from its operands."""
+        return hash(id(self))
+
+    def cache(self, *operands):
+        """
+        Caches the symbols and hash of a sentence built from `operands`,
+        unless one of them can still change.
+        """
+        self.frozen = all(operand.frozen for operand in operands)
+        if self.frozen:
+            self._symbols = self.collect()
+            self._hash = self.digest()
 
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def intern(cls, key, operands):
+        """
+        Returns the live sentence of class `cls` built from `operands`
+        (identified by `key`), or a new one if there is none yet.
+        """
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            sentence.build(*operands)
+            Sentence.interned[key] = sentence
+        return sentence
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -44,14 +88,22 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
+    def __new__(cls, name):
+        return cls.intern((cls, name), (name,))
+
+    def build(self, name):
         self.name = name
+        self.cache()
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    __hash__ = Sentence.__hash__
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __repr__(self):
         return self.name
@@ -65,20 +117,33 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def collect(self):
+        return frozenset([self.name])
+
+    def digest(self):
+        return hash(("symbol", self.name))
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    def __new__(cls, operand):
         Sentence.validate(operand)
+        return cls.intern((cls, id(operand)), (operand,))
+
+    def build(self, operand):
         self.operand = operand
+        self.cache(operand)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not)
+            and hash(self) == hash(other)
+            and self.operand == other.operand
+        )
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
+
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +154,50 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
+    def collect(self):
         return self.operand.symbols()
 
+    def digest(self):
+        return hash(("not", hash(self.operand)))
+
 
 class And(Sentence):
+    """
+    Conjunction of sentences. Unlike the other connectives it is never
+    shared, since knowledge bases grow through `add`: sentences built
+    on it recompute its symbols and hash when asked. It caches them
+    itself while none of its conjuncts can change.
+    """
+
+    frozen = False
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self.stable = all(conjunct.frozen for conjunct in conjuncts)
+        self._symbols = None
+        self._hash = None
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And)
+            and hash(self) == hash(other)
+            and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        digest = hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
+        if self.stable:
+            self._hash = digest
+        return digest
+
+    def __reduce__(self):
+        return (And, tuple(self.conjuncts))
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -116,6 +208,12 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self.stable = self.stable and conjunct.frozen
+        self._hash = None
+        if self._symbols is not None and self.stable:
+            self._symbols = self._symbols | conjunct.symbols()
+        else:
+            self._symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -127,23 +225,39 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        if self._symbols is not None:
+            return self._symbols
+        symbols = frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
+        if self.stable:
+            self._symbols = symbols
+        return symbols
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        key = (cls,) + tuple(id(disjunct) for disjunct in disjuncts)
+        return cls.intern(key, disjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+    def build(self, *disjuncts):
+        self.disjuncts = disjuncts
+        self.cache(*disjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+    def __eq__(self, other):
+        return self is other or (
+            isinstance(other, Or)
+            and hash(self) == hash(other)
+            and self.disjuncts == other.disjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
+    def __reduce__(self):
+        return (Or, self.disjuncts)
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -157,24 +271,41 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def collect(self):
+        return frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
+
+    def digest(self):
+        return hash(
+            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        )
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
+        key = (cls, id(antecedent), id(consequent))
+        return cls.intern(key, (antecedent, consequent))
+
+    def build(self, antecedent, consequent):
         self.antecedent = antecedent
         self.consequent = consequent
+        self.cache(antecedent, consequent)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and hash(self) == hash(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
+
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +319,39 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def collect(self):
+        return self.antecedent.symbols() | self.consequent.symbols()
+
+    def digest(self):
+        return hash(
+            ("implies", hash(self.antecedent), hash(self.consequent))
+        )
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
+        key = (cls, id(left), id(right))
+        return cls.intern(key, (left, right))
+
+    def build(self, left, right):
         self.left = left
         self.right = right
+        self.cache(left, right)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and hash(self) == hash(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
+
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -217,16 +363,51 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def collect(self):
+        return self.left.symbols() | self.right.symbols()
 
+    def digest(self):
+        return hash(("biconditional", hash(self.left), hash(self.right)))
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+
+def model_check(knowledge, query, backend="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    `backend` selects how entailment is decided:
+        - "enumerate": check every model of the symbols (truth table)
+        - "compiled": check every model with sentences compiled to Python
+        - "bitwise": evaluate all models at once as truth table bit vectors
+        - "parallel": check models with compiled sentences in a process pool
+        - "dpll": search for a model of knowledge ∧ ¬query with DPLL
+        - "resolution": refute knowledge ∧ ¬query by resolution
+        - "forward": forward chaining on Horn clauses, then resolution
+    """
+
+    if backend == "compiled":
+        import compiler
+        return compiler.compiled_check(knowledge, query)
+    elif backend == "bitwise":
+        import compiler
+        return compiler.bitwise_check(knowledge, query)
+    elif backend == "parallel":
+        import parallel
+        return parallel.parallel_check(knowledge, query)
+    elif backend == "dpll":
+        import dpll
+        return dpll.entails(knowledge, query)
+    elif backend == "resolution":
+        import inference
+        return inference.resolution(knowledge, query)
+    elif backend == "forward":
+        import inference
+        return inference.forward_chaining(knowledge, query)
+    elif backend != "enumerate":
+        raise ValueError(f"unknown model_check backend {backend}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +438,107 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that accepts sentences incrementally and answers
+    several entailment queries at once.
+
+    `backend` selects how queries are answered:
+        - "enumerate": one pass over the models, checking every query
+        - "bitwise": one truth table for the knowledge, one per query
+        - "dpll": one incremental solver, queried under assumptions
+    """
+
+    def __init__(self, *sentences, backend="dpll"):
+        if backend not in ("enumerate", "bitwise", "dpll"):
+            raise ValueError(f"unknown knowledge base backend {backend}")
+        self.backend = backend
+        self.knowledge = And()
+
+        # Clauses of the knowledge (and encoded queries) and their solver
+        self.cnf = None
+        self.solver = None
+        self.sent = 0
+        if backend == "dpll":
+            from cnf import CNF
+            from dpll import Solver
+            self.cnf = CNF()
+            self.solver = Solver()
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence known to be true."""
+        self.knowledge.add(sentence)
+        if self.cnf is not None:
+            self.cnf.add(sentence)
+            self.flush()
+
+    def flush(self):
+        """Passes clauses not yet seen by the solver to it."""
+        for clause in self.cnf.clauses[self.sent:]:
+            self.solver.add_clause(clause)
+        self.sent = len(self.cnf.clauses)
+
+    def entails(self, query, backend=None):
+        """
+        Checks if the knowledge base entails query. Any `model_check`
+        backend can be chosen for this query with `backend`.
+        """
+        if backend is not None and backend != self.backend:
+            return model_check(self.knowledge, query, backend)
+        return self.entails_all([query])[0]
+
+    def entails_all(self, queries):
+        """
+        Returns a list with, for each query in `queries`, whether the
+        knowledge base entails it.
+        """
+        queries = list(queries)
+        for query in queries:
+            Sentence.validate(query)
+
+        if self.backend == "dpll":
+
+            # Query definitions are added for good; only ¬query is assumed
+            results = []
+            for query in queries:
+                literal = self.cnf.encode(query)
+                self.flush()
+                results.append(self.solver.solve([-literal]) is None)
+            return results
+
+        import compiler
+        symbols = sorted(self.knowledge.symbols().union(
+            *[query.symbols() for query in queries]
+        ))
+
+        if self.backend == "bitwise":
+            table = compiler.columns(len(symbols))
+            mask = (1 << (1 << len(symbols))) - 1
+            knowledge = compiler.truth_table(self.knowledge, symbols, table)
+            return [
+                knowledge & (mask ^ compiler.truth_table(query, symbols, table))
+                == 0
+                for query in queries
+            ]
+
+        # Enumerate models once, dropping queries as counter-models appear
+        knowledge = compiler.compile_sentence(self.knowledge, symbols)
+        checks = [compiler.compile_sentence(query, symbols)
+                  for query in queries]
+        pending = set(range(len(queries)))
+        for model in itertools.product((False, True), repeat=len(symbols)):
+            if not pending:
+                break
+            if knowledge(model):
+                for i in [i for i in pending if not checks[i](model)]:
+                    pending.remove(i)
+        return [i in pending for i in range(len(queries))]
@@ -0,0 +1,78 @@
+import itertools
+import math
+import multiprocessing
+import os
+
+from compiler import compile_sentence
+
+# Number of models checked between looks at the stop signal
+STRIDE = 4096
+
+# The compiled knowledge and query, and the event telling every worker
+# that a counter-model was found, in this worker process
+worker = dict()
+
+
+def start(knowledge, query, symbols, stop):
+    """
+    Compiles the sentences once in each worker process.
+    """
+    worker["knowledge"] = compile_sentence(knowledge, symbols)
+    worker["query"] = compile_sentence(query, symbols)
+    worker["stop"] = stop
+
+
+def check_partition(task):
+    """
+    Checks entailment in the models whose first symbols are `prefix`,
+    returning False as soon as a counter-model is found, and None if
+    another worker found one first.
+    """
+    prefix, free = task
+    knowledge, query = worker["knowledge"], worker["query"]
+    stop = worker["stop"]
+    models = itertools.product((False, True), repeat=free)
+    while True:
+        if stop.is_set():
+            return None
+        chunk = list(itertools.islice(models, STRIDE))
+        if not chunk:
+            return True
+        for model in chunk:
+            model = prefix + model
+            if knowledge(model) and not query(model):
+                stop.set()
+                return False
+
+
+def parallel_check(knowledge, query, processes=None, fixed=None):
+    """
+    Checks if knowledge base entails query, enumerating models in
+    `processes` worker processes (one per CPU by default).
+
+    The model space is split into 2^`fixed` partitions by fixing the
+    first `fixed` symbols; by default there are about eight partitions
+    per process. All workers stop as soon as one finds a counter-model.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if fixed is None:
+        fixed = math.ceil(math.log2(processes * 8))
+    fixed = min(fixed, len(symbols))
+    free = len(symbols) - fixed
+
+    tasks = [
+        (prefix, free)
+        for prefix in itertools.product((False, True), repeat=fixed)
+    ]
+    stop = multiprocessing.Event()
+    with multiprocessing.Pool(
+        processes, initializer=start,
+        initargs=(knowledge, query, symbols, stop)
+    ) as pool:
+        for result in pool.imap_unordered(check_partition, tasks):
+            if result is False:
+                pool.terminate()
+                return False
+    return True
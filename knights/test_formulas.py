@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from formulas import from_json, load, parse, save, to_json, to_text
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+SYMBOLS = [Symbol(name) for name in
+           ["A", "B is a Knight", "x<y", "a=b", "c > d", "<", "é"]]
+
+
+def sentence(rng, depth):
+    """
+    Returns a random sentence over SYMBOLS, nested up to `depth`, with
+    chains of two or three operands (a single operand And or Or is
+    written as its operand).
+    """
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(SYMBOLS)
+    kind = rng.choice([Not, And, Or, Implication, Biconditional])
+    if kind is Not:
+        return Not(sentence(rng, depth - 1))
+    if kind in (And, Or):
+        return kind(*[sentence(rng, depth - 1)
+                      for _ in range(rng.randint(2, 3))])
+    return kind(sentence(rng, depth - 1), sentence(rng, depth - 1))
+
+
+def test_parse_formula():
+    rng = random.Random(0)
+    for _ in range(2000):
+        original = sentence(rng, 4)
+        assert parse(original.formula()) == original, original.formula()
+
+
+def test_parse_ascii_and_precedence():
+    a, b, c = (Symbol(name) for name in "ABC")
+    assert parse("~A & B | C") == Or(And(Not(a), b), c)
+    assert parse("A => B => C") == Implication(a, Implication(b, c))
+    assert parse("A <=> !(B | C)") == Biconditional(a, Not(Or(b, c)))
+    assert parse("") == And()
+    for text in ["A ∧", "(A", "A)", "A (B)", "∧ A", "A ¬B"]:
+        with pytest.raises(ValueError):
+            parse(text)
+
+
+def test_json_round_trip():
+    rng = random.Random(1)
+    for _ in range(500):
+        original = And(*[sentence(rng, 4) for _ in range(rng.randint(0, 4))])
+        assert from_json(to_json(original)) == original
+
+
+def test_files(tmp_path):
+    rng = random.Random(2)
+    knowledge = And(*[sentence(rng, 3) for _ in range(20)])
+    save(knowledge, tmp_path / "kb.json")
+    assert load(tmp_path / "kb.json") == knowledge
+
+    (tmp_path / "kb.txt").write_text(to_text(knowledge), encoding="utf-8")
+    assert load(tmp_path / "kb.txt").conjuncts == [
+        parse(conjunct.formula()) for conjunct in knowledge.conjuncts
+    ]
+
+
+def test_unparsable_names():
+    for name in ["a => b", "f(x)", "a|b", " A"]:
+        with pytest.raises(ValueError):
+            to_text(And(Symbol(name)))
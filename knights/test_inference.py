@@ -0,0 +1,137 @@
+import itertools
+import random
+
+from dpll import count_models
+from generate import puzzle
+from inference import resolution
+from parallel import parallel_check
+from logic import (And, Biconditional, Implication, KnowledgeBase, Not, Or,
+                   Symbol, model_check)
+
+SYMBOLS = [Symbol(name) for name in "ABCD"]
+BACKENDS = ["compiled", "bitwise", "dpll", "resolution", "forward"]
+
+
+def sentence(rng, depth):
+    """Returns a random sentence over SYMBOLS, nested up to `depth`."""
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(SYMBOLS)
+    kind = rng.choice([Not, And, Or, Implication, Biconditional])
+    if kind is Not:
+        return Not(sentence(rng, depth - 1))
+    if kind in (And, Or):
+        return kind(*[sentence(rng, depth - 1)
+                      for _ in range(rng.randint(1, 3))])
+    return kind(sentence(rng, depth - 1), sentence(rng, depth - 1))
+
+
+def test_backends_agree_with_enumeration():
+    rng = random.Random(0)
+    contradiction = And(SYMBOLS[0], Not(SYMBOLS[0]))
+
+    # Unsatisfiable knowledge bases, which entail every query, included
+    unsatisfiable = 0
+    for _ in range(1000):
+        knowledge = And(*[sentence(rng, 2) for _ in range(rng.randint(1, 4))])
+        query = sentence(rng, 2)
+        expected = model_check(knowledge, query)
+        unsatisfiable += model_check(knowledge, contradiction)
+        for backend in BACKENDS:
+            assert model_check(knowledge, query, backend) == expected, (
+                backend, knowledge, query
+            )
+    assert unsatisfiable > 50
+
+
+def test_shared_subsentences_compile_once():
+    a, b = SYMBOLS[:2]
+    sentence = Or(a, b)
+    for _ in range(40):
+        sentence = Biconditional(Or(sentence, a), Not(sentence))
+
+    # Expanded, the tree would have about 2^40 nodes
+    assert model_check(sentence, a, "compiled")
+    assert model_check(sentence, a, "bitwise")
+    assert not model_check(sentence, b, "bitwise")
+
+
+def test_knowledge_base_grows_between_queries():
+    rng = random.Random(1)
+    for _ in range(30):
+        bases = [KnowledgeBase(backend=backend)
+                 for backend in ("enumerate", "bitwise", "dpll")]
+        knowledge = And()
+        for _ in range(4):
+            known = sentence(rng, 2)
+            knowledge.add(known)
+            queries = [sentence(rng, 2) for _ in range(3)]
+            expected = [model_check(knowledge, query) for query in queries]
+            for base in bases:
+                base.add(known)
+                assert base.entails_all(queries) == expected, base.backend
+                assert base.entails(queries[0]) == expected[0]
+
+
+def brute_force_models(sentence):
+    """Counts the models of `sentence` over its symbols, one by one."""
+    symbols = sorted(sentence.symbols())
+    return sum(
+        sentence.evaluate(dict(zip(symbols, values)))
+        for values in itertools.product((False, True), repeat=len(symbols))
+    )
+
+
+def test_count_models():
+    rng = random.Random(2)
+    for _ in range(300):
+        knowledge = And(*[sentence(rng, 2) for _ in range(rng.randint(1, 3))])
+        assert count_models(knowledge) == brute_force_models(knowledge)
+        assert count_models(knowledge, limit=2) == min(
+            brute_force_models(knowledge), 2
+        )
+
+
+def test_generated_puzzles_are_satisfiable():
+    for seed in range(20):
+        knowledge, symbols = puzzle(4, seed=seed)
+        models = count_models(knowledge)
+        assert models >= 1
+        assert models == brute_force_models(knowledge)
+
+        # Every model makes each character exactly one of knight or knave
+        for knight, knave in symbols.values():
+            assert model_check(knowledge, Or(knight, knave))
+            assert model_check(knowledge, Not(And(knight, knave)))
+
+
+def test_parallel_check():
+    rng = random.Random(3)
+    for i in range(20):
+        knowledge = And(*[sentence(rng, 2) for _ in range(rng.randint(1, 4))])
+        query = sentence(rng, 2)
+
+        # Partitions from none to more symbols than there are
+        assert parallel_check(knowledge, query, processes=2, fixed=i % 6) == (
+            model_check(knowledge, query)
+        ), (knowledge, query)
+
+
+def test_resolution_within_budget():
+    rng = random.Random(4)
+    for budget in (0, 10, 100):
+        for _ in range(200):
+            knowledge = And(*[sentence(rng, 2)
+                              for _ in range(rng.randint(1, 4))])
+            query = sentence(rng, 2)
+            assert resolution(knowledge, query, budget) == (
+                model_check(knowledge, query)
+            )
+
+
+def test_no_exponential_clausification():
+    # Distributing ∨ over ∧ here would give 2^20 clauses
+    pairs = [(Symbol(f"x{i}"), Symbol(f"y{i}")) for i in range(20)]
+    knowledge = And(Or(*[And(x, y) for x, y in pairs]), Not(pairs[0][0]))
+    query = Or(*[x for x, _ in pairs[1:]])
+    for backend in ("resolution", "forward", "dpll"):
+        assert model_check(knowledge, query, backend)
@@ -0,0 +1,29 @@
+import pickle
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check
+
+A, B, C = Symbol("A"), Symbol("B"), Symbol("C")
+
+
+def test_interned():
+    assert Symbol("A") is A
+    assert Or(A, Not(B)) is Or(A, Not(B))
+    assert pickle.loads(pickle.dumps(Implication(A, B))) is Implication(A, B)
+
+
+def test_sentences_above_and_follow_add():
+    knowledge = And(A)
+    negation = Not(knowledge)
+    sentences = [negation, Or(C, knowledge), Implication(knowledge, C),
+                 Biconditional(C, negation), And(knowledge)]
+    hashes = [hash(sentence) for sentence in sentences]
+    knowledge.add(B)
+
+    assert [sentence.symbols() for sentence in sentences] == [
+        {"A", "B"}, {"A", "B", "C"}, {"A", "B", "C"}, {"A", "B", "C"},
+        {"A", "B"},
+    ]
+    assert [hash(sentence) for sentence in sentences] != hashes
+    assert negation == Not(And(A, B))
+    assert model_check(Implication(negation, A), A)
+    assert not model_check(Or(A, negation), A)
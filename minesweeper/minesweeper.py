@@ -1,6 +1,26 @@
+import collections
 import itertools
+import math
 import random
 
+import numpy as np
+
+
+# Trace levels: OFF records nothing, INFO records each step of
+# add_knowledge, and DEBUG also records every sentence it infers
+OFF, INFO, DEBUG = 0, 1, 2
+
+# Messages describing each kind of traced inference event
+MESSAGES = {
+    "1-adding": "1-adding cell {} to moves made",
+    "2-marking": "2-marking cell {} as safe",
+    "3-adding": "3-adding sentence {}={}",
+    "4a-marking": "4a-marking additional cells {} as safe",
+    "4b-marking": "4b-marking additional cells {} as mine",
+    "5a-adding": "5a-adding inferred sentence: {}={} from {}={} and {}={}",
+    "6a-marking": "6a-marking cells {} as safe by elimination",
+    "6b-marking": "6b-marking cells {} as mine by elimination",
+}
 
 
 class Minesweeper():
@@ -8,28 +28,43 @@ class Minesweeper():
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, representation="sets",
+                 safe=None):
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
-
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        self.representation = representation
+
+        # Add mines randomly at distinct positions i * width + j, skipping
+        # the position of cell `safe` (the first cell clicked), if given
+        positions = random.sample(range(height * width - (safe is not None)), mines)
+        if safe is not None:
+            skipped = safe[0] * width + safe[1]
+            positions = [p + (p >= skipped) for p in positions]
+        self.mines = {divmod(p, width) for p in positions}
+
+        field = np.zeros(height * width, dtype=np.int8)
+        field[positions] = 1
+        field = field.reshape(height, width)
+
+        # Count the mines around every cell at once, convolving the field
+        # with a 3x3 kernel of ones (minus its centre) as shifted sums
+        padded = np.pad(field, 1)
+        counts = -field
+        for di in range(3):
+            for dj in range(3):
+                counts = counts + padded[di:di + height, dj:dj + width]
+        self.counts = counts.tolist()
+
+        # The board is a list of rows of booleans or, with bits, an
+        # integer with the bit of each mine set
+        if representation == "bits":
+            self.board = 0
+            for p in positions:
+                self.board |= 1 << p
+        else:
+            self.board = field.astype(bool).tolist()
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -42,7 +77,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.is_mine((i, j)):
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -51,6 +86,8 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
+        if self.representation == "bits":
+            return bool(self.board >> (i * self.width + j) & 1)
         return self.board[i][j]
 
     def nearby_mines(self, cell):
@@ -59,24 +96,8 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        return self.counts[i][j]
 
     def won(self):
         """
@@ -102,6 +123,28 @@ class Sentence():
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def __len__(self):
+        return len(self.cells)
+
+    def key(self):
+        """
+        Returns a hashable value identifying the cells of the sentence.
+        """
+        return frozenset(self.cells)
+
+    def issubset(self, other):
+        """
+        Checks if every cell of this sentence is in sentence `other`.
+        """
+        return self.cells <= other.cells
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are
+        not in sentence `other`, assuming `other` is a subset of it.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -144,17 +187,428 @@ class Sentence():
             self.cells.remove(cell)
 
 
+class BitSentence():
+    """
+    Logical statement about a Minesweeper game, with its cells stored
+    as the set bits of an integer: bit `i * width + j` stands for cell
+    (i, j). Subset checks, differences and sizes are integer operations.
+    """
+
+    def __init__(self, cells, count, width=8):
+        self.width = width
+        self.mask = 0
+        for i, j in cells:
+            self.mask |= 1 << (i * width + j)
+        self.count = count
+
+        # Cells decoded from the mask, and the mask they were decoded from
+        self.decoded = None
+        self.decoded_mask = None
+
+    @classmethod
+    def from_mask(cls, mask, count, width):
+        sentence = cls((), count, width)
+        sentence.mask = mask
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        The set of cells of the sentence, as (i, j) tuples.
+        """
+        if self.decoded_mask == self.mask:
+            return set(self.decoded)
+        cells = set()
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            cells.add(divmod(low.bit_length() - 1, self.width))
+            mask ^= low
+        self.decoded = frozenset(cells)
+        self.decoded_mask = self.mask
+        return cells
+
+    def __eq__(self, other):
+        return self.mask == other.mask and self.count == other.count
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def key(self):
+        """
+        Returns the mask, which identifies the cells of the sentence.
+        """
+        return self.mask
+
+    def issubset(self, other):
+        """
+        Checks if every cell of this sentence is in sentence `other`.
+        """
+        return self.mask & ~other.mask == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are
+        not in sentence `other`, assuming `other` is a subset of it.
+        """
+        return BitSentence.from_mask(
+            self.mask & ~other.mask, self.count - other.count, self.width
+        )
+
+    def known_mines(self):
+        """
+        Returns the set of all cells known to be mines.
+        """
+        if len(self) == self.count:
+            return self.cells
+        return set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells known to be safe.
+        """
+        if self.count == 0:
+            return self.cells
+        return set()
+
+    def mark_mine(self, cell):
+        """
+        Removes a cell known to be a mine, decreasing the count.
+        """
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if self.mask & bit:
+            self.mask ^= bit
+            self.count -= 1
+
+    def mark_safe(self, cell):
+        """
+        Removes a cell known to be safe.
+        """
+        self.mask &= ~(1 << (cell[0] * self.width + cell[1]))
+
+
+class Knowledge():
+    """
+    Sentences known to be true about a Minesweeper game, indexed by
+    the cells they mention, with a worklist of the sentences that
+    changed since they were last used for inference.
+    """
+
+    def __init__(self):
+
+        # Sentences by id, ids of the sentences about each cell,
+        # and ids by sentence key, to keep a single sentence per key
+        self.sentences = dict()
+        self.cells = dict()
+        self.keys = dict()
+
+        # Ids of sentences waiting to be used for inference
+        self.pending = []
+        self.queued = set()
+
+    def __iter__(self):
+        return iter(list(self.sentences.values()))
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __contains__(self, sentence):
+        existing = self.keys.get(sentence.key())
+        return existing is not None and self.sentences[existing] == sentence
+
+    def queue(self, sid):
+        if sid not in self.queued:
+            self.queued.add(sid)
+            self.pending.append(sid)
+
+    def add(self, sentence):
+        """
+        Adds a sentence, unless it is empty or its cells are already
+        covered by another sentence. Returns True if it was added.
+        """
+        key = sentence.key()
+        if len(sentence) == 0 or key in self.keys:
+            return False
+        sid = id(sentence)
+        self.sentences[sid] = sentence
+        self.keys[key] = sid
+        for cell in sentence.cells:
+            self.cells.setdefault(cell, set()).add(sid)
+        self.queue(sid)
+        return True
+
+    def remove(self, sid):
+        """
+        Removes the sentence with id `sid`, and its key unless that
+        now belongs to another sentence.
+        """
+        sentence = self.sentences.pop(sid)
+        if self.keys.get(sentence.key()) == sid:
+            del self.keys[sentence.key()]
+        for cell in sentence.cells:
+            self.cells[cell].discard(sid)
+
+    def mark(self, cell, mine):
+        """
+        Marks a cell as a mine (or as safe, if `mine` is False) in the
+        sentences about it, queueing them again for inference.
+        """
+        for sid in self.cells.pop(cell, ()):
+            sentence = self.sentences[sid]
+            del self.keys[sentence.key()]
+            if mine:
+                sentence.mark_mine(cell)
+            else:
+                sentence.mark_safe(cell)
+
+            # Drop sentences left empty or identical to another one
+            key = sentence.key()
+            if len(sentence) == 0 or key in self.keys:
+                self.remove(sid)
+                continue
+            self.keys[key] = sid
+            self.queue(sid)
+
+    def pop(self):
+        """
+        Returns the next sentence waiting for inference, or None.
+        """
+        while self.pending:
+            sid = self.pending.pop()
+            self.queued.discard(sid)
+            if sid in self.sentences:
+                return self.sentences[sid]
+        return None
+
+    def overlapping(self, sentence):
+        """
+        Returns the other sentences sharing at least one cell with
+        `sentence`.
+        """
+        sids = set()
+        for cell in sentence.cells:
+            sids.update(self.cells.get(cell, ()))
+        sids.discard(id(sentence))
+        return [self.sentences[sid] for sid in sids]
+
+
+def count_configurations(cells, constraints):
+    """
+    Counts the mine configurations of `cells` consistent with every
+    constraint `(cells, count)` in `constraints`.
+
+    Returns two lists: `totals[m]`, the number of configurations with
+    `m` mines, and `mines[i][m]`, the number of those configurations
+    where `cells[i]` is a mine.
+
+    Cells are assigned one at a time (in the order of `ordering`), and
+    all the cells still to be assigned depend on is how many mines each
+    open constraint (one with cells on both sides) still needs. Configurations are counted
+    by that state, forwards and then backwards, so a component costs
+    its number of states rather than its number of solutions.
+    """
+    order = ordering(cells, constraints)
+    position = {cell: i for i, cell in enumerate(order)}
+    members = [sorted(position[cell] for cell in group) for group, _ in constraints]
+    watching = [[] for _ in cells]
+    for c, group in enumerate(members):
+        for i in group:
+            watching[i].append(c)
+
+    # Open constraints after each cell, and cells each has left after it
+    opened = [[] for _ in range(len(cells) + 1)]
+    for c, group in enumerate(members):
+        for i in range(group[0] + 1, group[-1] + 1):
+            opened[i].append(c)
+    left = [{c: len([j for j in members[c] if j > i]) for c in watching[i]}
+            for i in range(len(cells))]
+
+    # Counts by mines placed of the states after each cell, and the
+    # moves between states: (state before, mine, state after)
+    forward = [{(): [1]}]
+    moves = []
+    for i in range(len(cells)):
+        states, steps = dict(), []
+        for state, counts in forward[i].items():
+            needed = dict(zip(opened[i], state))
+            for mine in (0, 1):
+                consistent = True
+                for c in watching[i]:
+                    need = needed.get(c, constraints[c][1]) - mine
+                    if need < 0 or need > left[i][c]:
+                        consistent = False
+                        break
+                    needed[c] = need
+                if consistent:
+                    after = tuple(needed[c] for c in opened[i + 1])
+                    shifted = [0] * mine + counts
+                    if after in states:
+                        states[after] = add(states[after], shifted)
+                    else:
+                        states[after] = shifted
+                    steps.append((state, mine, after))
+                needed = dict(zip(opened[i], state))
+        forward.append(states)
+        moves.append(steps)
+
+    # Counts by mines placed in the cells after each state
+    backward = [dict() for _ in range(len(cells))] + [{(): [1]}]
+    for i in reversed(range(len(cells))):
+        for state, mine, after in moves[i]:
+            if after in backward[i + 1]:
+                shifted = [0] * mine + backward[i + 1][after]
+                backward[i][state] = add(backward[i].get(state, []), shifted)
+
+    totals = pad(forward[-1].get((), []), len(cells) + 1)
+    index = {cell: i for i, cell in enumerate(cells)}
+    mines = [None] * len(cells)
+    for i in range(len(cells)):
+        counts = []
+        for state, mine, after in moves[i]:
+            if mine and after in backward[i + 1]:
+                counts = add(counts, convolve(forward[i][state], [0] + backward[i + 1][after]))
+        mines[index[order[i]]] = pad(counts, len(cells) + 1)
+    return totals, mines
+
+
+def ordering(cells, constraints):
+    """
+    Returns `cells` in breadth-first order through the constraints
+    they share, starting each component from a cell as far as possible
+    from another, so that few constraints are open at any point.
+    """
+    neighbours = {cell: set() for cell in cells}
+    for group, _ in constraints:
+        for cell in group:
+            neighbours[cell].update(group)
+
+    def breadth_first(start):
+        found = {start: None}
+        frontier = collections.deque([start])
+        while frontier:
+            cell = frontier.popleft()
+            for other in sorted(neighbours[cell] - found.keys(),
+                                key=lambda other: len(neighbours[other])):
+                found[other] = None
+                frontier.append(other)
+        return list(found)
+
+    order = []
+    placed = set()
+    for cell in cells:
+        if cell not in placed:
+            start = breadth_first(breadth_first(cell)[-1])[-1]
+            component = breadth_first(start)
+            order.extend(component)
+            placed.update(component)
+    return order
+
+
+def add(a, b):
+    """
+    Returns the sum of two lists of counts indexed by number of mines.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    result = list(a)
+    for i, y in enumerate(b):
+        result[i] += y
+    return result
+
+
+def pad(counts, length):
+    """
+    Returns `counts` with zeros appended up to `length`.
+    """
+    return counts + [0] * (length - len(counts))
+
+
+def convolve(a, b):
+    """
+    Returns the convolution of two lists of counts indexed by number
+    of mines.
+    """
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+class Tracer():
+    """
+    Records the inference events of a MinesweeperAI up to a trace
+    level, keeping the last `capacity` events so that a game's
+    inference can be replayed, and printing them as they happen if
+    `echo` is set.
+
+    Callers compare their level with `tracer.level` before building an
+    event, so a tracer that is OFF costs a single comparison per step.
+    """
+
+    def __init__(self, level=OFF, capacity=10000, echo=False):
+        self.level = level
+        self.echo = echo
+        self.events = collections.deque(maxlen=capacity)
+
+    def record(self, level, step, *data):
+        """
+        Records an event: its level, its kind (a key of MESSAGES) and
+        the values describing it.
+        """
+        event = (level, step, data)
+        self.events.append(event)
+        if self.echo:
+            print(self.describe(event))
+
+    def describe(self, event):
+        """
+        Returns the message describing an event.
+        """
+        _, step, data = event
+        return "    " + MESSAGES[step].format(*data)
+
+    def replay(self, level=DEBUG):
+        """
+        Prints the recorded events up to `level`, oldest first.
+        """
+        for event in self.events:
+            if event[0] <= level:
+                print(self.describe(event))
+
+    def clear(self):
+        self.events.clear()
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, representation="sets",
+                 tracer=None, inference="pairwise"):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Sentences hold their cells in sets, or in integer bits ("bits")
+        self.representation = representation
+
+        # Sentences are combined in pairs, or also all at once ("linear")
+        self.inference = inference
+
+        # Total number of mines, if known, and the density assumed if not
+        self.total_mines = mines
+        self.density = 1 / 8 if mines is None else mines / (height * width)
+
+        # Mine configurations of frontier components, by their constraints
+        self.components = dict()
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -162,8 +616,19 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true
+        self.knowledge = Knowledge()
+
+        # Recorder of inference events (nothing is recorded by default)
+        self.tracer = tracer if tracer is not None else Tracer()
+
+    def sentence(self, cells, count):
+        """
+        Returns a sentence about `cells` in the AI's representation.
+        """
+        if self.representation == "bits":
+            return BitSentence(cells, count, self.width)
+        return Sentence(cells, count)
 
     def mark_mine(self, cell):
         """
@@ -171,8 +636,7 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.knowledge.mark(cell, True)
 
     def mark_safe(self, cell):
         """
@@ -180,8 +644,7 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.knowledge.mark(cell, False)
 
     def add_knowledge(self, cell, count):
         """
@@ -201,7 +664,9 @@ class MinesweeperAI():
         # -----------------------------------------------------------------------------------------------------------------------------------
         # CG: 1) mark the cell as a move that has been made:
         # -----------------------------------------------------------------------------------------------------------------------------------
-        print (F"    1-adding cell {cell} to moves made")
+        tracer = self.tracer
+        if tracer.level >= INFO:
+            tracer.record(INFO, "1-adding", cell)
         self.moves_made.add (cell)
         # -----------------------------------------------------------------------------------------------------------------------------------
         
@@ -209,7 +674,8 @@ class MinesweeperAI():
         # CG: 2) mark the cell as safe, if not already marked:
         # -----------------------------------------------------------------------------------------------------------------------------------
         if cell not in self.safes:
-            print (F"    2-marking cell {cell} as safe")
+            if tracer.level >= INFO:
+                tracer.record(INFO, "2-marking", cell)
             self.mark_safe(cell)
         # -----------------------------------------------------------------------------------------------------------------------------------
 
@@ -221,120 +687,69 @@ class MinesweeperAI():
 
         # CG: build a sentence with the data found:
         if len(empty) > 0:
-            new_sentence=Sentence(sorted(empty), new_count)
+            new_sentence=self.sentence(sorted(empty), new_count)
 
-            print (F"    3-adding sentence {new_sentence.cells}={new_sentence.count}")
+            if tracer.level >= INFO:
+                tracer.record(INFO, "3-adding", sorted(new_sentence.cells), new_sentence.count)
 
             # CG: add the sentence to the knowledge base:
-            self.knowledge.append(new_sentence)
+            self.knowledge.add(new_sentence)
         # -----------------------------------------------------------------------------------------------------------------------------------
 
         # -----------------------------------------------------------------------------------------------------------------------------------
-        # CG: 4) mark any additional cells as safe or as mines if it can be concluded based on the AI's knowledge base:
+        # CG: 4) and 5) mark cells as safe or as mines and add inferred sentences, until no sentence is left to process:
         # -----------------------------------------------------------------------------------------------------------------------------------
+        # CG: each sentence is processed when added or changed, against the sentences sharing cells with it:
+        while True:
 
-        # CG: initialize loop indicator as true:
-        sweep_again = True
-
-        # CG: loop until there are no new mines or safe cells identified:
-        while sweep_again:
+            # CG: get the next sentence from the worklist:
+            asentence = self.knowledge.pop()
+            if asentence is None:
 
-            # CG: let's say there are no new mines or safe cells
-            sweep_again = False
-
-            # CG: loop over the knowledge base:
-            for asentence in self.knowledge:
-
-                # CG: ignore and remove empty sentences from knowledge:
-                if len(asentence.cells) == 0:
-
-                    # CG: empty knowledge found - remove it from the list:
-                    self.knowledge.remove(asentence)
-
-                    # continue to next sentence:
+                # CG: with linear inference, also look for cells forced by any number of sentences combined:
+                if self.inference == "linear" and self.eliminate():
                     continue
+                break
 
-                # CG: if current cell bomb count is zero then all cells in sentence are safe:
-                if len(asentence.cells) > 0 and asentence.count == 0:
-
-                    print (F"    4a-marking additional cells {asentence.cells} as safe")
-
-                    # CG: mark block of cells as safe:
-                    self.mark_cells_safe(asentence.cells)
+            # CG: if sentence bomb count is zero then all cells in sentence are safe:
+            if asentence.count == 0:
 
-                    # CG: signal the loop to continue because changes where made:
-                    sweep_again = True
+                if tracer.level >= INFO:
+                    tracer.record(INFO, "4a-marking", sorted(asentence.cells))
 
-                # CG: if number of cells matches count, all cells are mines:
-                if len(asentence.cells) == asentence.count > 0:
-
-                    print (F"    4b-marking additional cells {asentence.cells} as mine")
-
-                    # CG: mark block of cells as mines:
-                    self.mark_cells_mine(asentence.cells)
+                # CG: mark block of cells as safe:
+                self.mark_cells_safe(asentence.cells)
+                continue
 
-                    # CG: signal the loop to continue because changes where made:
-                    sweep_again = True
+            # CG: if number of cells matches count, all cells are mines:
+            if len(asentence) == asentence.count:
 
-        # -----------------------------------------------------------------------------------------------------------------------------------
+                if tracer.level >= INFO:
+                    tracer.record(INFO, "4b-marking", sorted(asentence.cells))
 
-        # -----------------------------------------------------------------------------------------------------------------------------------
-        # CG: 5) add any new sentences to the AI's knowledge base if they can be inferred from existing knowledge:
-        # -----------------------------------------------------------------------------------------------------------------------------------
-        # CG: loop over all sentences in the knowledge:
-        for set1 in self.knowledge:
-
-            # CG: ignore empty cells:
-            if len(set1.cells) == 0:
+                # CG: mark block of cells as mines:
+                self.mark_cells_mine(asentence.cells)
                 continue
 
-            # CG: inner loop to get set to compare with first set:
-            for set2 in self.knowledge:
-
-                # CG: ignore empty cells:
-                if len(set2.cells) == 0:
-                    continue
+            # CG: compare the sentence only with sentences sharing cells with it:
+            for other in self.knowledge.overlapping(asentence):
 
-                # CG: Ignore identical sentences:
-                if set1.cells == set2.cells:
+                # CG: infer the sentence about the cells of the larger sentence not in the smaller one:
+                if other.issubset(asentence):
+                    new_sentence = asentence.difference(other)
+                elif asentence.issubset(other):
+                    new_sentence = other.difference(asentence)
+                else:
                     continue
 
-                # CG: check if set1 is a subset of set2:
-                if set1.cells.issubset(set2.cells):
-
-                    # CG: compute new set based on the differences between the two sets:
-                    new_cells = set2.cells - set1.cells
-                    new_count = abs(set2.count - set1.count)
+                # CG: add the new sentence to the knowledge base (it is queued for inference):
+                if self.knowledge.add(new_sentence) and tracer.level >= DEBUG:
+                    tracer.record(DEBUG, "5a-adding",
+                                  sorted(new_sentence.cells), new_sentence.count,
+                                  sorted(asentence.cells), asentence.count,
+                                  sorted(other.cells), other.count)
 
-                    # CG: build the new sentence:
-                    new_sentence = Sentence(sorted(new_cells), new_count)
-
-                    # CG: check if sentence is a valid sentence (not empty one):
-                    if len(new_sentence.cells) > 0:
-
-                        # CG: check if the new sentence is not already in the knowledge base:
-                        if new_sentence not in self.knowledge:
-
-                            # CG: add the new sentence data to the knowledge base:
-                            self.knowledge.append(new_sentence)
-
-                            print(F"    5a-adding inferred sentence: {sorted(new_sentence.cells)}={new_sentence.count} from {sorted(set1.cells)}={set1.count} and  {sorted(set2.cells)}={set2.count} ")
-
-                        # CG: check if the new sentence could be a set of safe cells:
-                        if len(new_sentence.cells) > 0 and new_sentence.count == 0:
-
-                            print(F"    5b-marking cells as safe: {sorted(new_sentence.cells)}={new_sentence.count}")
-
-                            # CG: mark the new set as safe:
-                            self.mark_cells_safe(new_sentence.cells)
-
-                        # CG: check if the new sentence could be a set of mine cells:
-                        elif len(new_sentence.cells) == new_sentence.count > 0:
-
-                            print(F"    5c-marking cells as mine: {sorted(new_sentence.cells)}={new_sentence.count}")
-
-                            # CG: mark the new set as mine:
-                            self.mark_cells_mine(new_sentence.cells)
+        # -----------------------------------------------------------------------------------------------------------------------------------
 
         #print (F"safes: {sorted(self.safes)}")
         #print (F"    mines found: {sorted(self.mines)}")
@@ -345,6 +760,78 @@ class MinesweeperAI():
     # -----------------------------------------------------------------------------------------------------------------------------------
 
 
+    def eliminate(self):
+        """
+        Marks every cell forced to be safe or a mine by the knowledge
+        base as a whole, which pairwise inference can miss when the
+        deduction needs three or more sentences.
+
+        The sentences form a linear system (one row per sentence, one
+        column per cell) reduced by Gauss-Jordan elimination, in exact
+        integer arithmetic so no tolerance is needed. In each
+        reduced row, cells are 0 or 1, so the row's value lies between
+        the sum of its negative and of its positive coefficients; when
+        it equals one of these bounds, every cell in the row is forced.
+        Returns True if any cell was marked.
+        """
+        sentences = list(self.knowledge)
+        if len(sentences) < 2:
+            return False
+
+        # CG: one row per sentence, as integer coefficients by cell and a value:
+        rows = [(dict.fromkeys(sentence.cells, 1), sentence.count) for sentence in sentences]
+
+        # CG: reduce them to reduced row echelon form without fractions, so the
+        # CG: comparisons below are exact: each row is multiplied through rather
+        # CG: than divided, and scaled back down by the gcd of its entries:
+        reduced = []
+        while rows:
+            pivot, value = min(rows, key=lambda row: len(row[0]))
+            rows.remove((pivot, value))
+            if not pivot:
+                continue
+            cell = min(pivot)
+            p = pivot[cell]
+            for k, (coefficients, total) in enumerate(rows + reduced):
+                c = coefficients.get(cell)
+                if c is None:
+                    continue
+                combined = {other: p * coefficients.get(other, 0) - c * pivot.get(other, 0)
+                            for other in coefficients.keys() | pivot.keys()}
+                combined = {other: n for other, n in combined.items() if n}
+                total = p * total - c * value
+                divisor = math.gcd(total, *combined.values())
+                if divisor > 1:
+                    combined = {other: n // divisor for other, n in combined.items()}
+                    total //= divisor
+                if k < len(rows):
+                    rows[k] = (combined, total)
+                else:
+                    reduced[k - len(rows)] = (combined, total)
+            reduced.append((pivot, value))
+
+        # CG: compare each row's value with the bounds of its left side:
+        safes, mines = set(), set()
+        for coefficients, value in reduced:
+            low = sum(n for n in coefficients.values() if n < 0)
+            high = sum(n for n in coefficients.values() if n > 0)
+            if value == low or value == high:
+                for cell, n in coefficients.items():
+                    if (n > 0) == (value == high):
+                        mines.add(cell)
+                    else:
+                        safes.add(cell)
+        safes, mines = safes - mines, mines - safes
+
+        if self.tracer.level >= INFO:
+            if safes:
+                self.tracer.record(INFO, "6a-marking", sorted(safes))
+            if mines:
+                self.tracer.record(INFO, "6b-marking", sorted(mines))
+        self.mark_cells_safe(safes)
+        self.mark_cells_mine(mines)
+        return bool(safes or mines)
+
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -377,6 +864,7 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        and, among those, have the lowest probability of being a mine.
         """
         # -----------------------------------------------------------------------------------------------------------------------------------
         # CG: initialize set of moves with safe choices not used first:
@@ -399,8 +887,14 @@ class MinesweeperAI():
         # CG: if no safe moves are available, return None:
         if len(set_of_moves) == 0: return None
 
-        # CG: randomly chooses a tuple from the list of possible moves, prefferably a safe one:
-        amove = random.choice(list(set_of_moves))
+        # CG: compute the probability of each possible move being a mine:
+        probabilities = self.mine_probabilities(set_of_moves)
+
+        # CG: randomly chooses a tuple among the possible moves with the lowest risk:
+        lowest = min(probabilities.values())
+        amove = random.choice(sorted(
+            cell for cell in set_of_moves if probabilities[cell] <= lowest + 1e-9
+        ))
 
         #print (F"randomly chosen move {amove} from {sorted(set_of_moves)}")
         
@@ -409,6 +903,115 @@ class MinesweeperAI():
         # -----------------------------------------------------------------------------------------------------------------------------------
 
 
+    def mine_probabilities(self, unknown):
+        """
+        Returns the exact probability of each cell in `unknown` (cells
+        neither played nor known to be mines) being a mine.
+
+        The frontier (cells in some sentence) is split into independent
+        components, whose consistent mine configurations are counted
+        once and remembered across turns. Components are combined by
+        weighting each total of frontier mines by the ways the remaining
+        mines fit in the other unknown cells (if the number of mines is
+        unknown, each cell is a mine with probability `self.density`).
+        """
+        # CG: collect the constraints and join sentences sharing cells into components:
+        sentences = [(frozenset(sentence.cells), sentence.count) for sentence in self.knowledge]
+        parent = dict()
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, count in sentences:
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            first = next(iter(cells))
+            for cell in cells:
+                parent[find(cell)] = find(first)
+
+        groups = dict()
+        for cells, count in sentences:
+            groups.setdefault(find(next(iter(cells))), []).append((cells, count))
+
+        # CG: count the configurations of each component, reusing those already counted:
+        components = []
+        for constraints in groups.values():
+            key = frozenset(constraints)
+            if key not in self.components:
+                cells = sorted(set().union(*[cells for cells, _ in constraints]))
+                self.components[key] = (cells, count_configurations(cells, constraints))
+            components.append(self.components[key])
+
+        # CG: forget components no longer on the board:
+        if len(self.components) > 4 * len(components) + 64:
+            used = {frozenset(constraints) for constraints in groups.values()}
+            self.components = {key: value for key, value in self.components.items() if key in used}
+
+        frontier = set(parent)
+        outside = len([cell for cell in unknown if cell not in frontier and cell not in self.safes])
+
+        # CG: weight of each total number of mines in the frontier, given the cells outside it:
+        def weights(size):
+            if self.total_mines is None:
+                return [self.density ** t * (1 - self.density) ** (size - t) for t in range(size + 1)]
+            remaining = self.total_mines - len(self.mines)
+            return [math.comb(outside, remaining - t) if 0 <= remaining - t <= outside else 0
+                    for t in range(size + 1)]
+
+        frontier_weights = weights(len(frontier))
+        everything = [1]
+        for _, (totals, _) in components:
+            everything = convolve(everything, totals)
+        normalizer = sum(w * n for w, n in zip(frontier_weights, everything))
+
+        # CG: with no consistent configuration, every move is equally risky:
+        if normalizer == 0:
+            return {cell: self.density for cell in unknown}
+
+        probabilities = dict()
+        for c, (cells, (totals, mines)) in enumerate(components):
+
+            # CG: configurations of every other component, by number of mines:
+            others = [1]
+            for d, (_, (other_totals, _)) in enumerate(components):
+                if d != c:
+                    others = convolve(others, other_totals)
+
+            # CG: weight of each number of mines in this component:
+            component_weights = [
+                sum(others[t] * frontier_weights[m + t] for t in range(len(others)))
+                for m in range(len(totals))
+            ]
+            for cell, counts in zip(cells, mines):
+                probabilities[cell] = sum(
+                    n * w for n, w in zip(counts, component_weights)
+                ) / normalizer
+
+        # CG: cells outside the frontier share the expected number of mines left:
+        if outside:
+            if self.total_mines is None:
+                chance = self.density
+            else:
+                remaining = self.total_mines - len(self.mines)
+                expected = sum(
+                    n * w * (remaining - t)
+                    for t, (n, w) in enumerate(zip(everything, frontier_weights))
+                ) / normalizer
+                chance = expected / outside
+            for cell in unknown:
+                if cell not in frontier:
+                    probabilities[cell] = chance
+
+        # CG: cells known to be safe are never mines:
+        for cell in unknown:
+            if cell in self.safes:
+                probabilities[cell] = 0
+
+        return probabilities
+
     # -----------------------------------------------------------------------------------------------------------------------------------------
     # CG: helper to gather intell about all surrounding cells in a cell's quadrant taht are empty (not moved, not mines, not known to be safe):
     # -----------------------------------------------------------------------------------------------------------------------------------------
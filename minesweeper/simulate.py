@@ -0,0 +1,174 @@
+import importlib.util
+import inspect
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper
+
+# AIs to compare, by name: the file defining each MinesweeperAI, and
+# the keyword arguments it is created with
+AIS = {
+    "minesweeper": ("minesweeper.py", {}),
+    "linear": ("minesweeper.py", {"inference": "linear"}),
+    "solution1": ("solution1.py", {}),
+    "solution2": ("solution2.py", {}),
+    "memory": ("minesweeper-memory.py", {}),
+}
+
+# Board sizes as (height, width, mines): beginner, intermediate, expert
+SIZES = [(8, 8, 8), (16, 16, 40), (16, 30, 99)]
+
+# Games played per AI and board size
+GAMES = 1000
+
+# The MinesweeperAI class of each AI by name, or the error raised
+# loading it, filled in once per worker process by `start`
+worker = dict()
+
+
+def load(name):
+    """
+    Loads the module defining AI `name`, with `print` replaced by a
+    function that does nothing so that games are not slowed by output.
+    """
+    filename, _ = AIS[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(f"ai_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    module.print = lambda *args, **kwargs: None
+    spec.loader.exec_module(module)
+    return module
+
+
+def start():
+    """
+    Loads every AI once in each worker process, remembering why the
+    ones that cannot be loaded failed.
+    """
+    for name in AIS:
+        try:
+            worker[name] = load(name).MinesweeperAI
+        except Exception as e:
+            worker[name] = e
+
+
+def play(task):
+    """
+    Plays one seeded game with an AI, returning the AI and board size,
+    whether it won, the number of random moves it made, the number of
+    cells it deduced to be safe or mines, and the seconds taken by each
+    move (choosing the move and adding the knowledge it revealed).
+    """
+    name, (height, width, mines), seed = task
+    AI = worker[name]
+    options = dict(AIS[name][1])
+    if "mines" in inspect.signature(AI).parameters:
+        options["mines"] = mines
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = AI(height=height, width=width, **options)
+
+    guessed = set()
+    latencies = []
+    revealed = set()
+    won = False
+    while len(latencies) < height * width:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is not None:
+                guessed.add(move)
+        if move is None or game.is_mine(move):
+            latencies.append(time.perf_counter() - start)
+            break
+        ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+
+        # The game is won when every safe cell has been revealed
+        revealed.add(move)
+        if len(revealed) == height * width - mines:
+            won = True
+            break
+
+    # Cells known without having been guessed were deduced (a guess
+    # that hit a mine is in neither set, so it is not subtracted)
+    known = set(getattr(ai, "mines", ())) | set(getattr(ai, "safes", ()))
+    deduced = len(known - guessed)
+    return name, (height, width, mines), won, len(guessed), deduced, latencies
+
+
+def simulate(names, sizes=SIZES, games=GAMES, processes=None):
+    """
+    Plays `games` games with each AI in `names` on each board size in
+    a pool of worker processes. Every AI plays the same seeded boards.
+
+    Returns a dictionary mapping each (AI, size) to a tuple of games
+    won, games played, random moves made, cells deduced, and the latency
+    of each move, and a dictionary mapping each AI that could not be
+    loaded to its error.
+    """
+    probe = dict()
+    for name in names:
+        try:
+            load(name)
+        except Exception as e:
+            probe[name] = e
+    names = [name for name in names if name not in probe]
+
+    tasks = [
+        (name, size, seed)
+        for size in sizes
+        for seed in range(games)
+        for name in names
+    ]
+    results = {(name, size): [0, 0, 0, 0, []]
+               for name in names for size in sizes}
+    with multiprocessing.Pool(processes, initializer=start) as pool:
+        for name, size, won, guesses, deduced, latencies in (
+            pool.imap_unordered(play, tasks, chunksize=16)
+        ):
+            result = results[name, size]
+            result[0] += won
+            result[1] += 1
+            result[2] += guesses
+            result[3] += deduced
+            result[4].extend(latencies)
+    return {key: tuple(value) for key, value in results.items()}, probe
+
+
+def main():
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        sys.exit("Usage: python simulate.py [games] [ai ...]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    names = sys.argv[2:] or list(AIS)
+    for name in names:
+        if name not in AIS:
+            sys.exit(f"Unknown AI {name}, choose from {', '.join(AIS)}")
+
+    results, failed = simulate(names, games=games)
+    for name, error in failed.items():
+        print(f"{name}: could not be loaded ({type(error).__name__}: {error})")
+
+    print(f"{'ai':<12} {'board':>10} {'win rate':>9} {'guesses':>8} "
+          f"{'deduced':>8} {'moves/s':>9} {'mean ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8}")
+    for (name, (height, width, mines)), result in sorted(
+        results.items(), key=lambda item: (item[0][1], item[0][0])
+    ):
+        won, played, guesses, deduced, latencies = result
+        latencies.sort()
+        total = sum(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<12} {f'{height}x{width}/{mines}':>10} "
+              f"{won / played:>9.1%} {guesses / played:>8.2f} "
+              f"{deduced / played:>8.1f} {len(latencies) / total:>9.0f} "
+              f"{1000 * total / len(latencies):>8.3f} {1000 * p99:>8.3f} "
+              f"{1000 * latencies[-1]:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import itertools
+import random
+import time
+
+import pytest
+
+from minesweeper import (DEBUG, INFO, OFF, Minesweeper, MinesweeperAI, Tracer,
+                         count_configurations)
+
+
+@pytest.mark.parametrize("representation", ["sets", "bits"])
+def test_nearby_mines(representation):
+    rng = random.Random(0)
+    for seed in range(200):
+        random.seed(seed)
+        height, width = rng.randint(1, 12), rng.randint(1, 12)
+        safe = (rng.randrange(height), rng.randrange(width)) if seed % 2 else None
+        mines = rng.randint(0, height * width - (safe is not None))
+        game = Minesweeper(height, width, mines, representation, safe=safe)
+
+        assert len(game.mines) == mines
+        assert safe not in game.mines
+        for i, j in itertools.product(range(height), range(width)):
+            assert game.is_mine((i, j)) == ((i, j) in game.mines)
+            expected = sum(
+                (a, b) in game.mines
+                for a in range(i - 1, i + 2)
+                for b in range(j - 1, j + 2)
+                if (a, b) != (i, j)
+            )
+            assert game.nearby_mines((i, j)) == expected
+
+
+def neighbours(cell, height, width):
+    i, j = cell
+    return {(a, b) for a in range(max(i - 1, 0), min(i + 2, height))
+            for b in range(max(j - 1, 0), min(j + 2, width))} - {cell}
+
+
+@pytest.mark.parametrize("inference", ["pairwise", "linear"])
+def test_mine_probabilities(inference):
+    height, width, mines = 4, 4, 4
+    cells = list(itertools.product(range(height), range(width)))
+    rng = random.Random(1)
+    for seed in range(100):
+        random.seed(seed)
+        game = Minesweeper(height, width, mines)
+        ai = MinesweeperAI(height, width, mines=mines, inference=inference)
+
+        # Reveal a few random safe cells
+        safe = [cell for cell in cells if cell not in game.mines]
+        for cell in rng.sample(safe, rng.randint(1, 5)):
+            if cell not in ai.moves_made:
+                ai.add_knowledge(cell, game.nearby_mines(cell))
+
+        # Every placement of the mines consistent with what was revealed
+        layouts = [
+            set(layout) for layout in itertools.combinations(cells, mines)
+            if not ai.moves_made & set(layout) and all(
+                len(neighbours(cell, height, width) & set(layout))
+                == game.nearby_mines(cell)
+                for cell in ai.moves_made
+            )
+        ]
+        unknown = set(cells) - ai.moves_made - ai.mines
+        probabilities = ai.mine_probabilities(unknown)
+        for cell in unknown:
+            expected = sum(cell in layout for layout in layouts) / len(layouts)
+            assert probabilities[cell] == pytest.approx(expected), cell
+
+
+def band(width, seed):
+    """
+    A 3-row strip with every other cell of its middle row revealed,
+    whose constraints leave exponentially many configurations.
+    """
+    rng = random.Random(seed)
+    revealed = {(1, j) for j in range(0, width, 2)}
+    cells = [(i, j) for i in range(3) for j in range(width) if (i, j) not in revealed]
+    mines = {cell for cell in cells if rng.random() < 0.3}
+    constraints = []
+    for cell in sorted(revealed):
+        group = frozenset(neighbours(cell, 3, width) - revealed)
+        constraints.append((group, len(group & mines)))
+    return cells, constraints
+
+
+def test_count_configurations():
+    for seed in range(20):
+        cells, constraints = band(6, seed)
+        totals, mines = count_configurations(cells, constraints)
+
+        # Every configuration of the cells, by brute force
+        layouts = [
+            layout for layout in itertools.product((False, True), repeat=len(cells))
+            if all(sum(layout[cells.index(cell)] for cell in group) == count
+                   for group, count in constraints)
+        ]
+        assert totals == [sum(sum(layout) == m for layout in layouts)
+                          for m in range(len(cells) + 1)]
+        for i in range(len(cells)):
+            assert mines[i] == [sum(layout[i] and sum(layout) == m for layout in layouts)
+                                for m in range(len(cells) + 1)]
+
+
+def test_count_configurations_expert():
+    # An expert-width strip has hundreds of millions of configurations
+    cells, constraints = band(30, 0)
+    begin = time.perf_counter()
+    totals, _ = count_configurations(cells, constraints)
+    assert sum(totals) > 10 ** 8
+    assert time.perf_counter() - begin < 1
+
+
+def traced_game(tracer, seed=0):
+    """
+    Plays a seeded 8x8 game with an AI reporting to `tracer`.
+    """
+    random.seed(seed)
+    game = Minesweeper(8, 8, 8)
+    ai = MinesweeperAI(8, 8, tracer=tracer)
+    while True:
+        move = ai.make_safe_move() or ai.make_random_move()
+        if move is None or game.is_mine(move):
+            return
+        ai.add_knowledge(move, game.nearby_mines(move))
+
+
+def test_tracer_levels(capsys):
+    everything = Tracer(DEBUG)
+    traced_game(everything)
+    levels = [level for level, _, _ in everything.events]
+    assert INFO in levels and DEBUG in levels
+
+    # A tracer records nothing above its level, and replays up to a level
+    info = Tracer(INFO)
+    traced_game(info)
+    assert list(info.events) == [event for event in everything.events if event[0] <= INFO]
+    off = Tracer(OFF)
+    traced_game(off)
+    assert not off.events
+
+    capsys.readouterr()
+    everything.replay(INFO)
+    assert capsys.readouterr().out.splitlines() == [
+        everything.describe(event) for event in info.events
+    ]
+
+
+def test_tracer_keeps_the_last_events():
+    everything = Tracer(DEBUG)
+    traced_game(everything)
+    assert len(everything.events) > 10
+
+    last = Tracer(DEBUG, capacity=10)
+    traced_game(last)
+    assert list(last.events) == list(everything.events)[-10:]
+    last.clear()
+    assert not last.events
+
+
+def test_linear_inference_finds_more():
+    # A 5x5 board where the revealed cells force (1, 4) to be safe and
+    # (2, 3) to be a mine, which no pair of sentences shows
+    mines = {(0, 3), (2, 3), (3, 1), (3, 2), (4, 2)}
+    revealed = [(3, 0), (4, 0), (4, 1), (0, 4), (1, 1), (1, 2)]
+    ais = {inference: MinesweeperAI(5, 5, inference=inference)
+           for inference in ("pairwise", "linear")}
+    for ai in ais.values():
+        for cell in revealed:
+            ai.add_knowledge(cell, len(neighbours(cell, 5, 5) & mines))
+
+    assert (1, 4) not in ais["pairwise"].safes
+    assert (2, 3) not in ais["pairwise"].mines
+    assert (1, 4) in ais["linear"].safes
+    assert (2, 3) in ais["linear"].mines
+    assert ais["linear"].mines <= mines
+    assert not ais["linear"].safes & mines
@@ -0,0 +1,44 @@
+import simulate
+
+
+def test_play_counts_guesses_and_deductions():
+    simulate.start()
+    outcomes = set()
+    for seed in range(20):
+        # One mine in two cells: the first move is always a guess
+        _, _, won, guesses, deduced, latencies = simulate.play(("minesweeper", (1, 2, 1), seed))
+        assert guesses == 1
+        assert len(latencies) == 1
+
+        # Revealing the safe cell shows where the mine is, but hitting
+        # the mine deduces nothing
+        assert deduced == (1 if won else 0)
+        outcomes.add(won)
+    assert outcomes == {False, True}
+
+
+def test_simulate_matches_sequential_play():
+    names = ["minesweeper", "linear"]
+    sizes = [(8, 8, 8), (16, 16, 40)]
+    games = 10
+    results, failed = simulate.simulate(names, sizes, games, processes=2)
+    assert failed == {}
+
+    simulate.start()
+    for name in names:
+        for size in sizes:
+            expected = [0, 0, 0, 0, 0]
+            for seed in range(games):
+                _, _, won, guesses, deduced, latencies = simulate.play((name, size, seed))
+                for k, value in enumerate((won, 1, guesses, deduced, len(latencies))):
+                    expected[k] += value
+            won, played, guesses, deduced, latencies = results[name, size]
+            assert [won, played, guesses, deduced, len(latencies)] == expected
+
+
+def test_simulate_reports_ais_that_cannot_be_loaded(monkeypatch):
+    monkeypatch.setitem(simulate.AIS, "missing", ("missing.py", {}))
+    results, failed = simulate.simulate(["minesweeper", "missing"], [(8, 8, 8)], 2, processes=1)
+    assert list(results) == [("minesweeper", (8, 8, 8))]
+    assert list(failed) == ["missing"]
+    assert isinstance(failed["missing"], FileNotFoundError)
@@ -0,0 +1,27 @@
+import sys
+import time
+
+from my_nim import DenseNimAI, NimAI, evaluate, train, train_batch
+
+# Training games played by each AI
+GAMES = 100000
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    print(f"{'ai':<10} {'games':>8} {'seconds':>8} {'games/s':>8} "
+          f"{'q-values':>9} {'optimal':>8}")
+    for name, player in [("dict", NimAI()), ("dense", DenseNimAI()),
+                         ("batch", DenseNimAI())]:
+        start = time.perf_counter()
+        if name == "batch":
+            train_batch(games, player, report=None)
+        else:
+            train(games, player, verbose=False)
+        seconds = time.perf_counter() - start
+        print(f"{name:<10} {games:>8} {seconds:>8.2f} {games / seconds:>8.0f} "
+              f"{len(player.q):>9} {evaluate(player):>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
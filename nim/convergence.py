@@ -0,0 +1,71 @@
+import csv
+import sys
+import time
+
+from my_nim import (CanonicalNimAI, DenseNimAI, NimAI, evaluate, train,
+                    train_batch)
+
+# Ways of training, each with the AI it trains and a function training
+# that AI on a number of games
+TRAINERS = {
+    "dict": (NimAI, lambda n, player: train(n, player, verbose=False)),
+    "dense": (DenseNimAI, lambda n, player: train(n, player, verbose=False)),
+    "canonical": (lambda: CanonicalNimAI(NimAI()),
+                  lambda n, player: train(n, player, verbose=False)),
+    "batch": (DenseNimAI,
+              lambda n, player: train_batch(n, player, report=None)),
+}
+
+# Training games in total, and between evaluations
+EPISODES = 100000
+EVERY = 10000
+
+
+def learning_curve(name, episodes=EPISODES, every=EVERY):
+    """
+    Trains a new AI with trainer `name`, evaluating it against the
+    optimal strategy every `every` games.
+
+    Returns a list of (games trained, seconds spent training, fraction
+    of winning positions played optimally).
+    """
+    create, trainer = TRAINERS[name]
+    player = create()
+    points = [(0, 0.0, evaluate(player))]
+    seconds = 0.0
+    while player.episodes < episodes:
+        start = time.perf_counter()
+        trainer(min(every, episodes - player.episodes), player)
+        seconds += time.perf_counter() - start
+        points.append((player.episodes, seconds, evaluate(player)))
+    return points
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python convergence.py [episodes] [every] [curve.csv]")
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else EPISODES
+    every = int(sys.argv[2]) if len(sys.argv) > 2 else EVERY
+
+    rows = []
+    curves = {name: learning_curve(name, episodes, every) for name in TRAINERS}
+    print(f"{'games':>8}  " + "".join(
+        f"{name + ' s':>12}{name + ' %':>12}" for name in TRAINERS
+    ))
+    for i, (games, _, _) in enumerate(curves["dict"]):
+        cells = []
+        for name, curve in curves.items():
+            _, seconds, optimal = curve[i]
+            cells.append(f"{seconds:>12.2f}{optimal:>12.1%}")
+            rows.append([name, games, seconds, optimal])
+        print(f"{games:>8}  " + "".join(cells))
+
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["trainer", "games", "seconds", "optimal"])
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
+import functools
+import itertools
+import json
 import math
+import multiprocessing
+import os
 import random
 import time
+from multiprocessing import shared_memory
+
+import numpy as np
 
 
 class Nim():
@@ -72,7 +80,7 @@ class Nim():
 
 class NimAI():
 
-    def __init__(self, alpha=0.5, epsilon=0.1):
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7]):
         """
         Initialize AI with an empty Q-learning dictionary,
         an alpha (learning) rate, and an epsilon rate.
@@ -81,10 +89,16 @@ class NimAI():
         pairs to a Q-value (a number).
          - `state` is a tuple of remaining piles, e.g. (1, 1, 4, 4)
          - `action` is a tuple `(i, j)` for an action
+
+        `initial` are the piles its training games start from.
         """
         self.q = dict()
         self.alpha = alpha
         self.epsilon = epsilon
+        self.initial = list(initial)
+
+        # Number of games trained on so far
+        self.episodes = 0
 
     def update(self, old_state, action, new_state, reward):
         """
@@ -228,17 +242,262 @@ class NimAI():
         return action
 
 
-def train(n):
+class DenseNimAI(NimAI):
+
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7]):
+        """
+        Initialize AI with a Q-table stored as a NumPy array, with a
+        row for each state reachable from the `initial` piles and a
+        column (slot) for each action.
+
+        States are numbered in mixed radix (pile `i` is a digit in
+        base `initial[i] + 1`), and action `(i, j)` takes slot `j - 1`
+        after the slots of the piles before `i`.
+        """
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.initial = list(initial)
+        self.episodes = 0
+
+        # Value of one object in each pile, in the state numbering
+        self.strides = []
+        states = 1
+        for pile in reversed(self.initial):
+            self.strides.insert(0, states)
+            states *= pile + 1
+
+        # Slot of each action, and action of each slot
+        self.actions = [(i, j) for i, pile in enumerate(self.initial)
+                        for j in range(1, pile + 1)]
+        self.slots = {action: slot for slot, action in enumerate(self.actions)}
+
+        # Q-values, and which actions are available in each state (as a
+        # mask, and as the slots of those actions, found when first needed)
+        self.table = np.zeros((states, len(self.actions)))
+        piles = (np.arange(states)[:, np.newaxis] // np.array(self.strides)
+                 % (np.array(self.initial) + 1))
+        piles = piles.astype(np.min_scalar_type(max(self.initial, default=0)))
+        self.mask = (np.array([j for _, j in self.actions], dtype=piles.dtype)
+                     <= piles[:, [i for i, _ in self.actions]])
+        self.legal = dict()
+
+    def index(self, state):
+        """
+        Returns the number of the state with piles `state`.
+        """
+        return sum(pile * stride for pile, stride in zip(state, self.strides))
+
+    def piles(self, index):
+        """
+        Returns the piles of the state numbered `index`.
+        """
+        return [index // stride % (pile + 1)
+                for pile, stride in zip(self.initial, self.strides)]
+
+    def available(self, index):
+        """
+        Returns the slots of the actions available in the state
+        numbered `index`.
+        """
+        legal = self.legal.get(index)
+        if legal is None:
+            legal = self.legal[index] = np.flatnonzero(self.mask[index])
+        return legal
+
+    @property
+    def q(self):
+        """
+        The learned Q-values, as the dictionary NimAI keeps.
+        """
+        q = dict()
+        for index, slot in zip(*np.nonzero(self.table)):
+            state = tuple(int(pile) for pile in self.piles(index))
+            q[(state, self.actions[slot])] = float(self.table[index, slot])
+        return q
+
+    def update(self, old_state, action, new_state, reward):
+        s = self.index(old_state)
+        a = self.slots[action]
+        old = self.table[s, a]
+        best_future = self.best_future_reward(new_state)
+        self.table[s, a] = old + self.alpha * (reward + best_future - old)
+
+    def get_q_value(self, state, action):
+        return float(self.table[self.index(state), self.slots[action]])
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        self.table[self.index(state), self.slots[action]] = (
+            old_q + self.alpha * (reward + future_rewards - old_q)
+        )
+
+    def best_future_reward(self, state):
+        s = self.index(state)
+        legal = self.available(s)
+        if len(legal) == 0:
+            return 0
+        return float(self.table[s, legal].max())
+
+    def choose_action(self, state, epsilon=True):
+        s = self.index(state)
+        legal = self.available(s)
+        if epsilon and random.random() < self.epsilon:
+            return self.actions[random.choice(legal)]
+        return self.actions[legal[self.table[s, legal].argmax()]]
+
+
+class CanonicalNimAI():
+
+    def __init__(self, ai):
+        """
+        Wraps an AI so that it only ever sees states with their piles
+        sorted, sharing what it learns across every ordering of the
+        same piles.
+
+        Actions are remapped between the actual and sorted piles.
+        The wrapped AI can be a NimAI, or a DenseNimAI whose initial
+        piles are sorted (the sorted states then stay in its table).
+        """
+        if isinstance(ai, DenseNimAI) and ai.initial != sorted(ai.initial):
+            raise ValueError(
+                f"a DenseNimAI needs sorted initial piles, not {ai.initial}"
+            )
+        self.ai = ai
+
+    @property
+    def initial(self):
+        return self.ai.initial
+
+    @property
+    def episodes(self):
+        return self.ai.episodes
+
+    @episodes.setter
+    def episodes(self, value):
+        self.ai.episodes = value
+
+    @staticmethod
+    def canonical(state):
+        """
+        Returns the sorted piles of `state`, and the index in `state`
+        of each sorted pile.
+        """
+        order = sorted(range(len(state)), key=lambda i: state[i])
+        return [state[i] for i in order], order
+
+    def update(self, old_state, action, new_state, reward):
+        state, order = self.canonical(old_state)
+        i, j = action
+        self.ai.update(state, (order.index(i), j), sorted(new_state), reward)
+
+    def get_q_value(self, state, action):
+        state, order = self.canonical(state)
+        i, j = action
+        return self.ai.get_q_value(state, (order.index(i), j))
+
+    def best_future_reward(self, state):
+        return self.ai.best_future_reward(sorted(state))
+
+    def choose_action(self, state, epsilon=True):
+        state, order = self.canonical(state)
+        i, j = self.ai.choose_action(state, epsilon=epsilon)
+        return (order[i], j)
+
+
+def winning(piles):
+    """
+    Checks if the player to move from `piles` wins with perfect play,
+    when whoever takes the last object loses (misère Nim).
+
+    While some pile has more than one object, the player to move wins
+    exactly when the nim-sum (xor) of the piles is not 0; once every
+    pile has at most one object, they win when an even number of piles
+    are left.
+    """
+    if any(pile > 1 for pile in piles):
+        return functools.reduce(lambda a, b: a ^ b, piles) != 0
+    return sum(piles) % 2 == 0
+
+
+class NimOracle():
+
+    def winning_actions(self, state):
+        """
+        Returns the actions that leave the other player in a losing
+        position (none, if `state` is itself losing).
+        """
+        return [
+            (i, j) for i, j in Nim.available_actions(state)
+            if not winning(state[:i] + [state[i] - j] + state[i + 1:])
+        ]
+
+    def choose_action(self, state, epsilon=False):
+        """
+        Returns an optimal action: a winning one if there is any, or
+        else taking one object from the largest pile.
+        """
+        state = list(state)
+        actions = self.winning_actions(state)
+        if actions:
+            return min(actions)
+        return (state.index(max(state)), 1)
+
+
+def evaluate(ai, initial=[1, 3, 5, 7], sample=None, seed=None):
+    """
+    Returns the fraction of winning positions reachable from `initial`
+    where `ai.choose_action(state, epsilon=False)` plays an optimal
+    (winning) action. If `sample` is given, only that many positions,
+    chosen at random, are checked.
+    """
+    oracle = NimOracle()
+    states = [
+        list(state)
+        for state in itertools.product(*[range(pile + 1) for pile in initial])
+        if sum(state) > 0 and winning(state)
+    ]
+    if sample is not None and sample < len(states):
+        states = random.Random(seed).sample(states, sample)
+    optimal = 0
+    for state in states:
+        action = ai.choose_action(state.copy(), epsilon=False)
+        optimal += action in oracle.winning_actions(state)
+    return optimal / len(states)
+
+
+def train(n, player=None, verbose=True, initial=None):
     """
     Train an AI by playing `n` games against itself.
+
+    `player` is the AI to train (a new NimAI by default), and
+    `verbose` prints a line for every game played. Games start from the
+    `initial` piles, by default those of the player, if it has any, or
+    else those of Nim. A NimAI (wrapped or not) remembers the piles it
+    was trained from; a DenseNimAI's table must have room for them.
     """
 
-    player = NimAI()
+    if player is None:
+        player = NimAI()
+    if initial is None:
+        initial = getattr(player, "initial", Nim().piles)
+    else:
+        ai = player.ai if isinstance(player, CanonicalNimAI) else player
+        if type(ai) is NimAI:
+            ai.initial = list(initial)
+        elif isinstance(ai, DenseNimAI):
+            piles = sorted(initial) if ai is not player else list(initial)
+            if len(piles) != len(ai.initial) or any(
+                pile > room for pile, room in zip(piles, ai.initial)
+            ):
+                raise ValueError(
+                    f"a DenseNimAI for piles {ai.initial} cannot train "
+                    f"from {list(initial)}"
+                )
 
     # Play n games
     for i in range(n):
-        print(f"Playing training game {i + 1}")
-        game = Nim()
+        if verbose:
+            print(f"Playing training game {i + 1}")
+        game = Nim(initial)
 
         # Keep track of last move made by either player
         last = {
@@ -282,12 +541,272 @@ def train(n):
                     0
                 )
 
-    print("Done training")
+        player.episodes += 1
+
+    if verbose:
+        print("Done training")
 
     # Return the trained AI
     return player
 
 
+def train_batch(n, player=None, batch=4096, report=100000, seed=None):
+    """
+    Train an AI by playing `n` games against itself, `batch` games at a
+    time in lockstep, with the piles of all games in one NumPy array.
+
+    `player` is the DenseNimAI to train (a new one by default). All
+    Q-updates of a move are applied at once; updates of the same
+    state and action in one move are averaged. Progress is printed
+    every `report` games (never, if `report` is None).
+    """
+
+    if player is None:
+        player = DenseNimAI()
+    if not isinstance(player, DenseNimAI):
+        raise TypeError(f"train_batch needs a DenseNimAI, "
+                        f"not a {type(player).__name__}")
+    rng = np.random.default_rng(seed)
+    strides = np.array(player.strides)
+    pile_of = np.array([i for i, _ in player.actions])
+    count_of = np.array([j for _, j in player.actions])
+    table, mask = player.table, player.mask
+
+    def best_future(states):
+        values = np.where(mask[states], table[states], -np.inf).max(axis=1)
+        return np.where(np.isfinite(values), values, 0)
+
+    played = 0
+    while played < n:
+        size = min(batch, n - played)
+        rows = np.arange(size)
+        piles = np.tile(player.initial, (size, 1))
+        playing = np.ones(size, dtype=bool)
+
+        # Last state and action of each player in each game (-1 if none)
+        last_state = np.full((size, 2), -1)
+        last_action = np.full((size, 2), -1)
+        turn = 0
+
+        while playing.any():
+            games = rows[playing]
+            states = piles[games] @ strides
+
+            # Choose the best action, or a random one with probability epsilon
+            legal = mask[states]
+            best = np.where(legal, table[states], -np.inf).argmax(axis=1)
+            scores = np.where(legal, rng.random(legal.shape), -1)
+            anything = scores.argmax(axis=1)
+            explore = rng.random(len(games)) < player.epsilon
+            actions = np.where(explore, anything, best)
+
+            last_state[games, turn] = states
+            last_action[games, turn] = actions
+            piles[games, pile_of[actions]] -= count_of[actions]
+            new_states = piles[games] @ strides
+            over = new_states == 0
+
+            # Rewards: -1 for taking the last object and 1 for the other
+            # player when a game ends, 0 for the other player otherwise
+            other = last_state[games, 1 - turn] >= 0
+            update_states = np.concatenate(
+                (states[over], last_state[games, 1 - turn][other])
+            )
+            update_actions = np.concatenate(
+                (actions[over], last_action[games, 1 - turn][other])
+            )
+            rewards = np.concatenate(
+                (np.full(over.sum(), -1.0), np.where(over[other], 1.0, 0.0))
+            )
+            futures = np.concatenate(
+                (new_states[over], new_states[other])
+            )
+
+            # Apply the updates, averaging those of the same pair
+            flat = update_states * table.shape[1] + update_actions
+            targets = rewards + best_future(futures)
+            deltas = player.alpha * (targets - table.flat[flat])
+            pairs, inverse = np.unique(flat, return_inverse=True)
+            table.flat[pairs] += (
+                np.bincount(inverse, weights=deltas) / np.bincount(inverse)
+            )
+
+            playing[games[over]] = False
+            turn = 1 - turn
+
+        if report and (played + size) // report > played // report:
+            print(f"Played {played + size} training games")
+        played += size
+        player.episodes += size
+
+    return player
+
+
+# The self-play worker's DenseNimAI, and its views of the shared and
+# local Q-tables in shared memory, set up by `start_worker`
+worker = dict()
+
+
+def start_worker(initial, alpha, epsilon, shared, local, processes):
+    """
+    Creates the worker's DenseNimAI and attaches to the shared table
+    and to the array of the workers' local tables.
+    """
+    player = DenseNimAI(alpha=alpha, epsilon=epsilon, initial=initial)
+    shape = player.table.shape
+    worker["player"] = player
+    worker["memory"] = [shared_memory.SharedMemory(name=shared),
+                        shared_memory.SharedMemory(name=local)]
+    worker["shared"] = np.ndarray(shape, buffer=worker["memory"][0].buf)
+    worker["local"] = np.ndarray(
+        (processes,) + shape, buffer=worker["memory"][1].buf
+    )
+
+
+def self_play(task):
+    """
+    Trains the worker's AI on `games` games, starting from the shared
+    table, and stores the result in the worker's slot of the local
+    tables.
+    """
+    slot, games, seed = task
+    player = worker["player"]
+    player.table[:] = worker["shared"]
+    train_batch(games, player, report=None, seed=seed)
+    worker["local"][slot] = player.table
+    return games
+
+
+def train_parallel(n, player=None, processes=None, rounds=10, seed=None):
+    """
+    Train an AI by playing `n` games against itself in `processes`
+    worker processes (one per CPU by default).
+
+    Training runs in `rounds`: in each round, every worker copies the
+    shared Q-table, trains its copy with `train_batch` on its share of
+    the games, and the shared table becomes the average of the copies.
+    The tables live in shared memory, so they are not pickled between
+    processes.
+    """
+
+    if player is None:
+        player = DenseNimAI()
+    if not isinstance(player, DenseNimAI):
+        raise TypeError(f"train_parallel needs a DenseNimAI, "
+                        f"not a {type(player).__name__}")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    table = player.table
+    shared = shared_memory.SharedMemory(create=True, size=table.nbytes)
+    local = shared_memory.SharedMemory(
+        create=True, size=processes * table.nbytes
+    )
+    try:
+        master = np.ndarray(table.shape, buffer=shared.buf)
+        copies = np.ndarray((processes,) + table.shape, buffer=local.buf)
+        master[:] = table
+        seeds = np.random.SeedSequence(seed).spawn(processes * rounds)
+
+        with multiprocessing.Pool(
+            processes, initializer=start_worker,
+            initargs=(player.initial, player.alpha, player.epsilon,
+                      shared.name, local.name, processes)
+        ) as pool:
+            played = 0
+            for r in range(rounds):
+                games = (n - played) // (rounds - r)
+                tasks = [
+                    (slot, games // processes + (slot < games % processes),
+                     seeds[r * processes + slot])
+                    for slot in range(processes)
+                ]
+                pool.map(self_play, tasks)
+                np.mean(copies, axis=0, out=master)
+                played += games
+        table[:] = master
+        player.episodes += n
+        del master, copies
+    finally:
+        shared.close()
+        shared.unlink()
+        local.close()
+        local.unlink()
+
+    return player
+
+
+# Checkpoint format: MAGIC, the byte length of the metadata, the
+# metadata as JSON, and the dense Q-table as little-endian doubles
+MAGIC = b"NIMQ"
+
+
+def save(player, path):
+    """
+    Writes a checkpoint of a trained NimAI or DenseNimAI (possibly
+    wrapped in a CanonicalNimAI) to `path`, with its alpha, epsilon,
+    initial piles and episodes trained. A NimAI's Q-values are stored
+    as a dense table too, large enough for every state it has seen.
+    """
+    canonical = isinstance(player, CanonicalNimAI)
+    if canonical:
+        player = player.ai
+    if isinstance(player, DenseNimAI):
+        dense = player
+    else:
+        piles = list(player.initial)
+        for state, _ in player.q:
+            if len(state) != len(piles):
+                raise ValueError(
+                    f"Q-values for {len(state)} piles, expected {len(piles)}"
+                )
+            piles = [max(a, b) for a, b in zip(piles, state)]
+        dense = DenseNimAI(initial=piles)
+        for (state, action), value in player.q.items():
+            dense.table[dense.index(state), dense.slots[action]] = value
+    metadata = json.dumps({
+        "kind": "dense" if dense is player else "dict",
+        "canonical": canonical,
+        "alpha": player.alpha,
+        "epsilon": player.epsilon,
+        "initial": player.initial,
+        "table": dense.initial,
+        "episodes": player.episodes,
+        "shape": dense.table.shape,
+    }).encode("utf-8")
+    table = dense.table.astype("<f8", copy=False)
+    with open(path, "wb") as f:
+        f.write(MAGIC + len(metadata).to_bytes(4, "little") + metadata)
+        f.write(table.tobytes())
+
+
+def load(path):
+    """
+    Reads a checkpoint written by `save`, returning an AI of the same
+    class (and wrapper), ready to play or to train further.
+    """
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a Nim checkpoint")
+        length = int.from_bytes(f.read(4), "little")
+        metadata = json.loads(f.read(length).decode("utf-8"))
+        table = np.fromfile(f, dtype="<f8")
+
+    player = DenseNimAI(metadata["alpha"], metadata["epsilon"],
+                        metadata.get("table", metadata["initial"]))
+    if table.size != player.table.size:
+        raise ValueError(f"{path} has a Q-table of the wrong size")
+    player.table = table.reshape(player.table.shape)
+    if metadata["kind"] == "dict":
+        q = player.q
+        player = NimAI(metadata["alpha"], metadata["epsilon"],
+                       metadata["initial"])
+        player.q = q
+    player.episodes = metadata["episodes"]
+    if metadata.get("canonical"):
+        player = CanonicalNimAI(player)
+    return player
+
+
 def play(ai, human_player=None):
     """
     Play human game against the AI.
@@ -1,4 +1,13 @@
-from nim import train, play
+import os
 
-ai = train(10000)
+from my_nim import load, play, save, train
+
+# Trained AI, reused by later launches instead of training again
+CHECKPOINT = "nim.ckpt"
+
+if os.path.exists(CHECKPOINT):
+    ai = load(CHECKPOINT)
+else:
+    ai = train(10000)
+    save(ai, CHECKPOINT)
 play(ai)
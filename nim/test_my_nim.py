@@ -0,0 +1,182 @@
+import functools
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from my_nim import (CanonicalNimAI, DenseNimAI, NimAI, NimOracle, evaluate,
+                    load, save, train, train_batch, train_parallel, winning)
+
+INITIAL = [1, 3, 5, 7]
+
+
+def states(initial):
+    """Returns every state reachable from the `initial` piles."""
+    return [list(state) for state in
+            itertools.product(*[range(pile + 1) for pile in initial])]
+
+
+def test_dense_index_and_slots():
+    ai = DenseNimAI(initial=INITIAL)
+    seen = set()
+    for state in states(INITIAL):
+        index = ai.index(state)
+        assert ai.piles(index) == state
+        seen.add(index)
+
+        # The legal mask, and the slots found from it, are the actions
+        # of the state
+        actions = [ai.actions[slot] for slot in ai.available(index)]
+        assert actions == sorted((i, j) for i, pile in enumerate(state)
+                                 for j in range(1, pile + 1))
+        assert list(np.flatnonzero(ai.mask[index])) == list(ai.available(index))
+    assert seen == set(range(ai.table.shape[0]))
+    assert all(ai.slots[action] == slot for slot, action in enumerate(ai.actions))
+
+
+def test_dense_and_dict_choose_the_same_action():
+    rng = random.Random(0)
+    dense = DenseNimAI(initial=INITIAL)
+    ai = NimAI(initial=INITIAL)
+
+    # Distinct random Q-values, so that the best action is unique
+    values = rng.sample(range(dense.table.size), dense.table.size)
+    dense.table[:] = np.reshape(values, dense.table.shape)
+    ai.q = dense.q
+    for state in states(INITIAL):
+        if sum(state):
+            assert dense.choose_action(state, epsilon=False) == \
+                ai.choose_action(state, epsilon=False)
+            for action in [(i, j) for i, pile in enumerate(state)
+                           for j in range(1, pile + 1)]:
+                assert dense.get_q_value(state, action) == \
+                    ai.get_q_value(state, action)
+            assert dense.best_future_reward(state) == ai.best_future_reward(state)
+
+
+def test_train_batch():
+    ai = train_batch(100000, DenseNimAI(), report=None, seed=0)
+    assert ai.episodes == 100000
+    assert evaluate(ai) >= 0.9
+
+    # Only the actions of each state are ever updated
+    assert not ai.table[~ai.mask].any()
+
+    # Games are seeded, so training is reproducible
+    again = train_batch(100000, DenseNimAI(), report=None, seed=0)
+    assert np.array_equal(ai.table, again.table)
+
+
+def test_train_parallel():
+    ai = train_parallel(100000, DenseNimAI(), processes=2, rounds=4, seed=0)
+    assert ai.episodes == 100000
+    assert evaluate(ai) >= 0.7
+    assert not ai.table[~ai.mask].any()
+
+    # Each worker's games are seeded and the merge is an average, so
+    # training is reproducible too
+    again = train_parallel(100000, DenseNimAI(), processes=2, rounds=4, seed=0)
+    assert np.array_equal(ai.table, again.table)
+
+
+def nonzero(q):
+    """Returns the Q-values of `q` that are not 0."""
+    return {key: value for key, value in q.items() if value}
+
+
+def assert_same(loaded, ai):
+    """Checks that a loaded AI is the AI it was saved from."""
+    assert type(loaded) is type(ai)
+    if isinstance(ai, CanonicalNimAI):
+        assert_same(loaded.ai, ai.ai)
+        return
+    assert (loaded.alpha, loaded.epsilon) == (ai.alpha, ai.epsilon)
+    assert loaded.initial == ai.initial
+    assert loaded.episodes == ai.episodes
+
+    # A missing Q-value is 0, and the table does not keep those stored
+    assert nonzero(loaded.q) == nonzero(ai.q)
+    if isinstance(ai, DenseNimAI):
+        assert np.array_equal(loaded.table, ai.table)
+
+
+@pytest.mark.parametrize("make", [
+    lambda: train(300, NimAI(alpha=0.3, epsilon=0.2), verbose=False),
+    lambda: train_batch(3000, DenseNimAI(alpha=0.3), report=None, seed=0),
+    lambda: train(300, CanonicalNimAI(NimAI()), verbose=False),
+    lambda: train(300, CanonicalNimAI(DenseNimAI()), verbose=False),
+])
+def test_checkpoint_round_trip(make, tmp_path):
+    random.seed(0)
+    ai = make()
+    path = tmp_path / "nim.q"
+    save(ai, path)
+    loaded = load(path)
+    assert_same(loaded, ai)
+
+    # A loaded AI keeps training where it left off
+    random.seed(1)
+    train(10, ai, verbose=False)
+    random.seed(1)
+    train(10, loaded, verbose=False)
+    assert_same(loaded, ai)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        load(path)
+
+
+@functools.lru_cache(maxsize=None)
+def search(piles):
+    """
+    Checks by exhaustive search if the player to move from `piles`
+    wins, when whoever takes the last object loses.
+    """
+    if not any(piles):
+        return True
+    return any(
+        not search(tuple(sorted(piles[:i] + (pile - j,) + piles[i + 1:])))
+        for i, pile in enumerate(piles) for j in range(1, pile + 1)
+    )
+
+
+def test_winning_matches_search():
+    for size in range(1, 5):
+        for piles in itertools.product(range(6), repeat=size):
+            assert winning(list(piles)) == search(tuple(sorted(piles))), piles
+
+
+def test_evaluate():
+    assert evaluate(NimOracle()) == 1
+    assert evaluate(NimOracle(), initial=[2, 4, 6, 8]) == 1
+
+    # Almost every position is played well after a few thousand games
+    random.seed(0)
+    assert evaluate(train(3000, NimAI(), verbose=False)) >= 0.9
+    assert evaluate(NimAI()) < 0.9
+
+
+def test_train_from_other_piles(tmp_path):
+    random.seed(0)
+
+    # A wrapped NimAI remembers the piles it trained from too
+    ai = train(200, CanonicalNimAI(NimAI()), verbose=False, initial=[1, 2, 3, 4, 5, 6])
+    assert ai.initial == [1, 2, 3, 4, 5, 6]
+    save(ai, tmp_path / "nim.q")
+    assert_same(load(tmp_path / "nim.q"), ai)
+
+    # A DenseNimAI can train from smaller piles (sorted ones, if wrapped)
+    dense = train(200, DenseNimAI(), verbose=False, initial=[1, 2, 3, 4])
+    assert dense.initial == [1, 3, 5, 7]
+    train(200, CanonicalNimAI(DenseNimAI()), verbose=False, initial=[7, 5, 3, 1])
+
+    # but not from piles its table has no room for
+    for initial in ([7, 5, 3, 1], [1, 3, 5, 7, 9], [1, 3, 5]):
+        with pytest.raises(ValueError):
+            train(1, DenseNimAI(), verbose=False, initial=initial)
+    with pytest.raises(ValueError):
+        train(1, CanonicalNimAI(DenseNimAI()), verbose=False, initial=[8, 1, 1, 1])
@@ -0,0 +1,182 @@
+import json
+import multiprocessing
+import os
+import posixpath
+import sys
+import time
+import urllib.parse
+from html.parser import HTMLParser
+
+import numpy as np
+
+# Bytes of HTML read and fed to the parser at a time
+CHUNK = 1 << 16
+
+# Below this many pages, crawling in a pool costs more than it saves
+SEQUENTIAL = 1000
+
+# Edge list format: MAGIC, the byte length of the metadata, the
+# metadata as JSON (the page names), then the links of the pages in
+# turn as CSR pointers (little-endian int64) and page numbers (int32)
+MAGIC = b"PGRK"
+
+# The corpus directory that each worker process reads pages from,
+# set by `start`
+worker = dict()
+
+
+class LinkParser(HTMLParser):
+    """
+    Collects the href of every <a> tag of a page, as it is fed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.links.append(value)
+
+
+def normalize(link, page):
+    """
+    Return the page of the corpus that `link`, found on `page`, points
+    to: a path relative to the corpus directory, like the page names.
+    Return None for links to other sites or outside the corpus.
+    """
+    parts = urllib.parse.urlsplit(link.strip())
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = urllib.parse.unquote(parts.path)
+    if path.startswith("/"):
+        path = path.lstrip("/")
+    else:
+        path = posixpath.join(posixpath.dirname(page), path)
+    path = posixpath.normpath(path)
+    if path == ".." or path.startswith("../"):
+        return None
+    return path
+
+
+def pages(directory):
+    """
+    Return the names of the HTML pages under `directory`, as paths
+    relative to it with "/" separators.
+    """
+    found = []
+    for root, _, filenames in os.walk(directory):
+        prefix = os.path.relpath(root, directory).replace(os.sep, "/")
+        for filename in filenames:
+            if filename.endswith(".html"):
+                found.append(filename if prefix == "." else
+                             f"{prefix}/{filename}")
+    return found
+
+
+def start(directory):
+    """
+    Remembers the corpus directory in each worker process.
+    """
+    worker["directory"] = directory
+
+
+def links(page):
+    """
+    Streams `page` through a LinkParser, returning the page and the
+    set of (normalized) pages its links point to.
+    """
+    parser = LinkParser()
+    path = os.path.join(worker["directory"], *page.split("/"))
+    with open(path, errors="replace") as f:
+        while chunk := f.read(CHUNK):
+            parser.feed(chunk)
+    parser.close()
+    found = {normalize(link, page) for link in parser.links}
+    found.discard(None)
+    return page, found
+
+
+def crawl(directory, processes=None):
+    """
+    Parse a directory of HTML pages, in a pool of `processes` worker
+    processes for large corpora, and check for links to other pages.
+    Return a dictionary where each key is a page, and values are
+    the set of other pages in the corpus that are linked to by the page.
+    """
+    names = pages(directory)
+    known = set(names)
+    corpus = dict()
+
+    def collect(results):
+        # Only include links to other pages in the corpus
+        for page, found in results:
+            found.discard(page)
+            corpus[page] = found & known
+
+    if processes == 1 or len(names) < SEQUENTIAL:
+        start(directory)
+        collect(map(links, names))
+    else:
+        with multiprocessing.Pool(processes, initializer=start,
+                                  initargs=(directory,)) as pool:
+            collect(pool.imap(links, names, chunksize=64))
+    return corpus
+
+
+def save(corpus, path):
+    """
+    Writes the pages of `corpus` and their links to `path` as a
+    compact edge list.
+    """
+    names = list(corpus)
+    index = {page: i for i, page in enumerate(names)}
+    counts = np.fromiter((len(corpus[page]) for page in names),
+                         dtype="<i8", count=len(names))
+    pointers = np.concatenate(([0], np.cumsum(counts))).astype("<i8")
+    targets = np.fromiter(
+        (index[link] for page in names for link in corpus[page]),
+        dtype="<i4", count=int(pointers[-1])
+    )
+    metadata = json.dumps({"pages": names}).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(MAGIC + len(metadata).to_bytes(4, "little") + metadata)
+        f.write(pointers.tobytes())
+        f.write(targets.tobytes())
+
+
+def load(path):
+    """
+    Reads an edge list written by `save`, returning the corpus.
+    """
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not an edge list")
+        length = int.from_bytes(f.read(4), "little")
+        names = json.loads(f.read(length).decode("utf-8"))["pages"]
+        pointers = np.fromfile(f, dtype="<i8", count=len(names) + 1)
+        targets = np.fromfile(f, dtype="<i4")
+    if len(pointers) != len(names) + 1 or len(targets) != pointers[-1]:
+        raise ValueError(f"{path} is truncated")
+
+    return {
+        page: {names[i] for i in targets[pointers[j]:pointers[j + 1]]}
+        for j, page in enumerate(names)
+    }
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python crawler.py corpus edges [processes]")
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    begin = time.perf_counter()
+    corpus = crawl(sys.argv[1], processes)
+    save(corpus, sys.argv[2])
+    print(f"{len(corpus)} pages, {sum(map(len, corpus.values()))} links "
+          f"in {time.perf_counter() - begin:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
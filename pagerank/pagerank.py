@@ -1,11 +1,19 @@
+import math
 import os
 import random
-import re
 import sys
 
+import numpy as np
+import scipy.sparse
+
+import crawler
+
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Total change in PageRank values (L1 norm) below which iteration stops
+TOLERANCE = 1e-8
+
 
 def main():
     if len(sys.argv) != 2:
@@ -26,26 +34,12 @@ def crawl(directory):
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
-    """
-    pages = dict()
-
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
 
-    # Only include links to other pages in the corpus
-    for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
-
-    return pages
+    `directory` can also be an edge list written by `crawler.py`.
+    """
+    if os.path.isfile(directory):
+        return crawler.load(directory)
+    return crawler.crawl(directory)
 
 
 def transition_model(corpus, page, damping_factor):
@@ -115,40 +109,108 @@ def sample_pagerank(corpus, damping_factor, n):
         print ("Invalid parameter, 'damping_factor' = zero!")
         raise ValueError
 
-    # CG: initialize dictionaries:
-    pages_sampled = dict()
-    resulting_dict = dict()
+    # CG: list the pages, and the links of each page, once:
+    pages = list(corpus.keys())
+    links = {apage: tuple(corpus[apage]) for apage in pages}
 
-    # CG: initialize dictionary with keys for each pages and an empty set for the turns of times sampled:
-    for apage in list(corpus.keys()):
-        pages_sampled.update({apage:[]})
+    # CG: initialize the count of samples of each page:
+    pages_sampled = dict.fromkeys(pages, 0)
 
     # CG: randomly select first page:
-    current_page = random.choices(list(corpus.keys()))[0]
-
-    # CG: keep count number of samples:
-    count = n
-
-    # CG: sampling loop:
-    while count:
-        # CG: call the transition model for a page:
-        result_dict = transition_model(corpus, current_page, damping_factor)
-        # CG: updates samples ran for page:
-        pages_sampled[current_page].append(count)
-        # CG: chooses new page based on the results of last page:
-        current_page = random.choices(list(result_dict.keys()), weights=list(result_dict.values()))[0]
-        # CG: decrement count:
-        count -= 1
-
-    # CG: compute resulting dictionary:
-    for apage in list(pages_sampled.keys()):
-        resulting_dict.update({apage:len(pages_sampled[apage])/n})
-
-    # CG: return the resulting dictionay:
-    return resulting_dict
+    current_page = random.choice(pages)
+
+    # CG: sampling loop, drawing each next page in two steps instead of building the transition model:
+    for _ in range(n):
+        pages_sampled[current_page] += 1
+        # CG: with probability damping_factor follow a random link, if the page has any:
+        if links[current_page] and random.random() < damping_factor:
+            current_page = random.choice(links[current_page])
+        # CG: otherwise go to a random page of the corpus:
+        else:
+            current_page = random.choice(pages)
+
+    # CG: return the resulting dictionary:
+    return {apage: count / n for apage, count in pages_sampled.items()}
+
+
+def sample_pagerank_vectorized(corpus, damping_factor, n, surfers=1000,
+                               seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages, like
+    `sample_pagerank`, with up to `surfers` independent random surfers
+    moving at once.
+
+    Surfers start at random pages, and take enough steps before their
+    pages are counted for the start to weigh less than TOLERANCE.
+    """
+    if n < 1 or not 0 < damping_factor < 1.0:
+        raise ValueError
+
+    # CG: the transposed transition matrix lists the links of each page, plus
+    # one unused target so that pages without links pick one in range:
+    pages, matrix, dangling = transition_matrix(corpus)
+    pointers, targets = matrix.indptr, np.append(matrix.indices, 0)
+    links = np.diff(pointers)
+    N = len(pages)
+    rng = np.random.default_rng(seed)
+
+    # CG: the chance of still following the start decays by damping_factor each step:
+    surfers = min(surfers, n)
+    burn_in = math.ceil(math.log(TOLERANCE) / math.log(damping_factor))
+    steps = math.ceil(n / surfers)
+
+    counts = np.zeros(N, dtype=np.int64)
+    current = rng.integers(N, size=surfers)
+    for step in range(burn_in + steps):
+
+        # CG: count the pages of the surfers, until n samples are taken:
+        if step >= burn_in:
+            left = n - (step - burn_in) * surfers
+            counts += np.bincount(current[:left], minlength=N)
 
+        # CG: each surfer follows one of its page's links, or jumps to a random page:
+        follow = (rng.random(surfers) < damping_factor) & ~dangling[current]
+        choice = pointers[current] + (rng.random(surfers) * links[current]).astype(np.int64)
+        current = np.where(follow, targets[choice],
+                           rng.integers(N, size=surfers))
 
-def iterate_pagerank(corpus, damping_factor):
+    return dict(zip(pages, (counts / n).tolist()))
+
+
+def transition_matrix(corpus):
+    """
+    Return the pages of `corpus` in a fixed order, the transition
+    matrix of the random surfer following links, and which pages have
+    no links.
+
+    Entry (p, i) of the sparse matrix is the chance of going from page
+    i to page p by clicking a link, 1 / links(i); the columns of pages
+    with no links are empty. It is built as the CSR matrix of links
+    by source page, transposed.
+    """
+
+    # CG: number the pages:
+    pages = list(corpus.keys())
+    index = {page: i for i, page in enumerate(pages)}
+
+    # CG: list the links of each page in turn, as page numbers:
+    links = np.fromiter((len(corpus[page]) for page in pages),
+                        dtype=np.int64, count=len(pages))
+    targets = np.fromiter(
+        (index[link] for page in pages for link in corpus[page]),
+        dtype=np.int64, count=links.sum()
+    )
+
+    # CG: each link from page i is followed with probability 1 / links(i):
+    pointers = np.concatenate(([0], np.cumsum(links)))
+    weights = np.repeat(1 / np.maximum(links, 1), links)
+    matrix = scipy.sparse.csr_matrix(
+        (weights, targets, pointers), shape=(len(pages), len(pages))
+    )
+    return pages, matrix.T, links == 0
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -156,54 +218,34 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    Each iteration is a product with the sparse transition matrix; a
+    page with no links is treated as linking to every page (including
+    itself), by adding its rank evenly to all pages. Iteration stops
+    when the ranks change by less than `tolerance` in total (L1 norm).
     """
 
     # CG: make sure damping_factor is valid:
     if not 0 < damping_factor < 1.0:
         raise ValueError
 
-    # CG: initialize variables:
-    page_prob = dict()
-    PR = dict()
-    oPR=dict()
-    list_of_pages = list(corpus.keys())
-    list_of_pages_done = []
-
-    # CG: compute N:
-    N = len(list_of_pages)
-
-    # CG: compute (1-d) / N:
-    common_prob = (1 - damping_factor) / N
-
-    # CG: load initial values into dictionaries:
-    for apage in list_of_pages:
-        page_prob.update({apage:1/N})
-        PR.update({apage:common_prob})
-
-    # CG: loops until differences reach 0.001 of less:
-    while list_of_pages_done != list_of_pages:
-        # CG: iterates thru the pages in the corpus:
-        for p in list_of_pages:
-            # CG: iterates thru the pages in the corpus:
-            for i in list_of_pages:
-                # CG: keep old values for future comparison:
-                oPR[p] = PR[p]
-                # CG: if page(i) links to page(p), compute and accumulate PR(p): 
-                if p in list(corpus[i]):
-                    PR[p] = PR[p] + damping_factor * (page_prob[i] / len(list(corpus[i])))
-                # CG: if a page has no links, assume it has links to all pages:
-                if len(list(corpus[i])) == 0:
-                    PR[p] = PR[p] + damping_factor * (page_prob[i] / N)
-                
-                # CG: if difference between new and previous is 0.001 or less:
-                if abs(oPR[p] - PR[p]) <= 0.001:
-                    # CG: and the page is not in the list:
-                    if p not in list_of_pages_done:
-                        # CG: add the page to the list:
-                        list_of_pages_done.append(p)
-
-    # CG: return the reulting dictionary:
-    return PR
+    # CG: build the transition matrix once:
+    pages, matrix, dangling = transition_matrix(corpus)
+    N = len(pages)
+
+    # CG: start from equal ranks and iterate until they stop changing:
+    ranks = np.full(N, 1 / N)
+    while True:
+        spread = ranks[dangling].sum() / N
+        new_ranks = damping_factor * (matrix @ ranks + spread)
+        new_ranks += (1 - damping_factor) / N
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            break
+
+    # CG: return the resulting dictionary:
+    return dict(zip(pages, ranks.tolist()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import os
+import re
+
+import crawler
+
+# Directory of the corpora
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def regex_crawl(directory):
+    """The original crawl: a regular expression over every page."""
+    pages = dict()
+    for filename in os.listdir(directory):
+        if filename.endswith(".html"):
+            with open(os.path.join(directory, filename)) as f:
+                links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"",
+                                   f.read())
+            pages[filename] = set(links) - {filename}
+    return {page: links & pages.keys() for page, links in pages.items()}
+
+
+def test_crawl_matches_regex():
+    for name in ("corpus0", "corpus1", "corpus2", "corpus4"):
+        directory = os.path.join(HERE, name)
+        assert crawler.crawl(directory) == regex_crawl(directory)
+
+
+def test_normalize():
+    assert crawler.normalize("b.html", "a.html") == "b.html"
+    assert crawler.normalize("./b.html#top", "a.html") == "b.html"
+    assert crawler.normalize("../b.html", "sub/a.html") == "b.html"
+    assert crawler.normalize("/sub/c.html?x=1", "a.html") == "sub/c.html"
+    assert crawler.normalize("../b.html", "a.html") is None
+    assert crawler.normalize("http://example.com/b.html", "a.html") is None
+    assert crawler.normalize("#top", "a.html") is None
+
+
+def test_crawl_in_pool_and_round_trip(tmp_path, monkeypatch):
+    os.mkdir(tmp_path / "sub")
+    for i in range(50):
+        (tmp_path / f"{i}.html").write_text(
+            f'<a href="{(i + 1) % 50}.html">next</a>'
+            f"<A HREF='sub/{i % 3}.html'>sub</A>"
+            '<a href="https://example.com/">away</a>'
+        )
+    for i in range(3):
+        (tmp_path / "sub" / f"{i}.html").write_text(
+            f'<a href="../{i}.html">up</a><a href="/sub/{i}.html">self</a>'
+        )
+
+    corpus = crawler.crawl(str(tmp_path))
+    assert corpus["7.html"] == {"8.html", "sub/1.html"}
+    assert corpus["sub/2.html"] == {"2.html"}
+    monkeypatch.setattr(crawler, "SEQUENTIAL", 0)
+    assert crawler.crawl(str(tmp_path), processes=2) == corpus
+
+    path = str(tmp_path / "corpus.edges")
+    crawler.save(corpus, path)
+    assert crawler.load(path) == corpus
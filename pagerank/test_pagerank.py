@@ -0,0 +1,76 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from pagerank import (DAMPING, crawl, iterate_pagerank,
+                      sample_pagerank_vectorized)
+
+# Directory of the corpora
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def random_corpus(rng, size):
+    """Returns a random corpus of `size` pages, some without links."""
+    pages = [f"{i}.html" for i in range(size)]
+    return {
+        page: set(rng.sample([other for other in pages if other != page],
+                             rng.randint(0, min(size - 1, 5))))
+        for page in pages
+    }
+
+
+def eigenvector(corpus, damping_factor):
+    """
+    Returns the PageRank of each page as the principal eigenvector of
+    the dense Google matrix.
+    """
+    pages = list(corpus)
+    n = len(pages)
+    google = np.full((n, n), (1 - damping_factor) / n)
+    for i, page in enumerate(pages):
+        links = corpus[page] or pages
+        for link in links:
+            google[pages.index(link), i] += damping_factor / len(links)
+    values, vectors = np.linalg.eig(google)
+    vector = np.real(vectors[:, np.argmax(np.real(values))])
+    return dict(zip(pages, vector / vector.sum()))
+
+
+def test_iterate_pagerank_matches_eigenvector():
+    rng = random.Random(0)
+    for _ in range(50):
+        corpus = random_corpus(rng, rng.randint(1, 30))
+        ranks = iterate_pagerank(corpus, DAMPING)
+        expected = eigenvector(corpus, DAMPING)
+        assert sum(ranks.values()) == pytest.approx(1)
+        for page in corpus:
+            assert ranks[page] == pytest.approx(expected[page], abs=1e-6)
+
+
+def test_iterate_pagerank_corpus0():
+    ranks = iterate_pagerank(crawl(os.path.join(HERE, "corpus0")), DAMPING)
+    assert [round(ranks[f"{i}.html"], 4) for i in range(1, 5)] == [
+        0.2199, 0.4292, 0.2199, 0.1310
+    ]
+
+
+def test_sample_pagerank_vectorized_is_unbiased():
+    corpus = crawl(os.path.join(HERE, "corpus4"))
+    ranks = iterate_pagerank(corpus, DAMPING)
+    samples = [sample_pagerank_vectorized(corpus, DAMPING, 10000, seed=seed)
+               for seed in range(100)]
+    for page in corpus:
+        mean = sum(sample[page] for sample in samples) / len(samples)
+        assert mean == pytest.approx(ranks[page], abs=0.002)
+
+
+def test_sample_pagerank_vectorized_takes_n_samples():
+    corpus = random_corpus(random.Random(1), 20)
+    for n in (1, 7, 999, 1001, 2500):
+        ranks = sample_pagerank_vectorized(corpus, DAMPING, n, seed=n)
+        assert sum(ranks.values()) == pytest.approx(1)
+        assert all(round(rank * n, 9).is_integer() for rank in ranks.values())
+    ranks = sample_pagerank_vectorized({"a": set(), "b": set()}, DAMPING, 100)
+    assert sum(ranks.values()) == pytest.approx(1)
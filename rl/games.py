@@ -0,0 +1,241 @@
+import os
+import random
+import sys
+import time
+
+from rl import Agent, Game, linear
+
+# The games live in the other projects of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for project in ("nim", "tictactoe", "minesweeper"):
+    sys.path.append(os.path.join(ROOT, project))
+
+import minesweeper  # noqa: E402
+import my_nim  # noqa: E402
+import tictactoe  # noqa: E402
+
+
+class NimGame(Game):
+    """
+    Misère Nim from `nim/my_nim.py`. States are (piles, player) with
+    piles as a tuple, keyed by the piles alone in mixed radix.
+    """
+
+    players = 2
+
+    def __init__(self, initial=[1, 3, 5, 7]):
+        self.piles = tuple(initial)
+
+    def initial(self):
+        return (self.piles, 0)
+
+    def player(self, state):
+        return state[1]
+
+    def actions(self, state):
+        return sorted(my_nim.Nim.available_actions(state[0]))
+
+    def result(self, state, action):
+        piles, player = state
+        i, j = action
+        piles = piles[:i] + (piles[i] - j,) + piles[i + 1:]
+        return (piles, 1 - player)
+
+    def terminal(self, state):
+        return not any(state[0])
+
+    def reward(self, state, player):
+        # Whoever took the last object lost, so the player to move won
+        return 1 if player == state[1] else -1
+
+    def key(self, state):
+        key = 0
+        for pile, initial in zip(state[0], self.piles):
+            key = key * (initial + 1) + pile
+        return key
+
+
+class TicTacToeGame(Game):
+    """
+    Tic-tac-toe, with the board as a tuple of 9 cells holding
+    `tictactoe.X`, `tictactoe.O` or `tictactoe.EMPTY`, and keyed in
+    base 3. X (player 0) moves first.
+    """
+
+    players = 2
+
+    # Cells of each row, column and diagonal
+    LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7),
+             (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+    DIGITS = {tictactoe.EMPTY: 0, tictactoe.X: 1, tictactoe.O: 2}
+
+    def initial(self):
+        return (tictactoe.EMPTY,) * 9
+
+    def player(self, state):
+        x, o = state.count(tictactoe.X), state.count(tictactoe.O)
+        return 0 if x == o else 1
+
+    def actions(self, state):
+        return [(i // 3, i % 3) for i, cell in enumerate(state)
+                if cell is tictactoe.EMPTY]
+
+    def result(self, state, action):
+        i = action[0] * 3 + action[1]
+        mark = tictactoe.X if self.player(state) == 0 else tictactoe.O
+        return state[:i] + (mark,) + state[i + 1:]
+
+    def winner(self, state):
+        for a, b, c in self.LINES:
+            if state[a] is not tictactoe.EMPTY and (
+                state[a] == state[b] == state[c]
+            ):
+                return 0 if state[a] == tictactoe.X else 1
+        return None
+
+    def terminal(self, state):
+        return self.winner(state) is not None or tictactoe.EMPTY not in state
+
+    def reward(self, state, player):
+        winner = self.winner(state)
+        if winner is None:
+            return 0
+        return 1 if winner == player else -1
+
+    def key(self, state):
+        key = 0
+        for cell in state:
+            key = key * 3 + self.DIGITS[cell]
+        return key
+
+    @staticmethod
+    def board(state):
+        """Returns `state` as a board of `tictactoe.py`."""
+        return [list(state[i:i + 3]) for i in range(0, 9, 3)]
+
+
+class MinesweeperGame(Game):
+    """
+    Minesweeper on a new random board from `minesweeper/minesweeper.py`
+    every game. States are (game, visible, exploded), where `visible`
+    is a tuple with the number of nearby mines of each revealed cell
+    and -1 for the others; they are keyed by what is visible alone.
+    """
+
+    def __init__(self, height=4, width=4, mines=2):
+        self.height = height
+        self.width = width
+        self.mines = mines
+
+    def initial(self):
+        game = minesweeper.Minesweeper(self.height, self.width, self.mines)
+        return (game, (-1,) * (self.height * self.width), False)
+
+    def actions(self, state):
+        return [divmod(i, self.width)
+                for i, count in enumerate(state[1]) if count < 0]
+
+    def result(self, state, action):
+        game, visible, _ = state
+        if game.is_mine(action):
+            return (game, visible, True)
+        i = action[0] * self.width + action[1]
+        count = game.nearby_mines(action)
+        return (game, visible[:i] + (count,) + visible[i + 1:], False)
+
+    def terminal(self, state):
+        hidden = sum(count < 0 for count in state[1])
+        return state[2] or hidden == self.mines
+
+    def reward(self, state, player):
+        return -1 if state[2] else 1
+
+    def key(self, state):
+        key = 0
+        for count in state[1]:
+            key = key * 10 + count + 1
+        return key
+
+
+class NimPlayer():
+    """
+    The greedy policy of an agent playing NimGame, with the interface
+    of NimAI, so that `my_nim.evaluate` can check it.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    def choose_action(self, piles, epsilon=False):
+        return self.agent.choose_action((tuple(piles), 0), epsilon=False)
+
+
+def greedy_games(agent, opponent, games, seed=0):
+    """
+    Plays `games` games of a two player game between the agent's
+    greedy policy and `opponent` (a function from state to action),
+    alternating who moves first. Returns the fraction of games won,
+    drawn and lost by the agent.
+    """
+    rng = random.Random(seed)
+    game = agent.game
+    outcomes = [0, 0, 0]
+    for i in range(games):
+        state = game.initial()
+        me = i % 2
+        while not game.terminal(state):
+            if game.player(state) == me:
+                action = agent.choose_action(state, epsilon=False)
+            else:
+                action = opponent(state, rng)
+            state = game.result(state, action)
+        outcomes[1 - game.reward(state, me)] += 1
+    return [count / games for count in outcomes]
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python games.py [episodes]")
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    schedule = linear(0.5, 0.05, episodes // 2)
+
+    def random_move(state, rng):
+        return rng.choice(agent.game.actions(state))
+
+    for name, game, options in [
+        ("nim", NimGame(), dict()),
+        ("nim sarsa(0.5)", NimGame(), dict(algorithm="sarsa", trace=0.5)),
+        ("tictactoe", TicTacToeGame(), dict()),
+        ("tictactoe q(0.5)", TicTacToeGame(), dict(trace=0.5)),
+        ("minesweeper 4x4/2", MinesweeperGame(), dict(gamma=0.9)),
+    ]:
+        agent = Agent(game, epsilon=schedule, **options)
+        start = time.perf_counter()
+        agent.train(episodes)
+        seconds = time.perf_counter() - start
+
+        if isinstance(game, NimGame):
+            optimal = my_nim.evaluate(NimPlayer(agent))
+            quality = f"optimal in {optimal:.1%} of positions"
+        elif isinstance(game, TicTacToeGame):
+            won, drawn, lost = greedy_games(agent, random_move, 1000)
+            quality = (f"vs random: {won:.1%} won, {drawn:.1%} drawn, "
+                       f"{lost:.1%} lost")
+        else:
+            won = 0
+            for _ in range(1000):
+                state = game.initial()
+                while not game.terminal(state):
+                    state = game.result(
+                        state, agent.choose_action(state, epsilon=False)
+                    )
+                won += not state[2]
+            quality = f"won {won / 1000:.1%} of games"
+
+        print(f"{name:<18} {episodes} games in {seconds:6.2f}s "
+              f"({episodes / seconds:6.0f}/s), {len(agent.q):>6} states, "
+              f"{quality}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import math
+import random
+
+
+class Game():
+    """
+    Protocol for the games an Agent learns to play. States can be any
+    value; `key` turns them into the compact hashable key the Q-table
+    is indexed by.
+
+    Turn-based games have `players` > 1: each player's move is then
+    rewarded and evaluated from the state in which that same player
+    moves again (or the game ends), as NimAI does.
+    """
+
+    # Number of players taking turns
+    players = 1
+
+    def initial(self):
+        """Returns the starting state of a new game."""
+        raise NotImplementedError
+
+    def player(self, state):
+        """Returns the player (0 to players - 1) to move in `state`."""
+        return 0
+
+    def actions(self, state):
+        """Returns the list of actions available in `state`."""
+        raise NotImplementedError
+
+    def result(self, state, action):
+        """Returns the state after taking `action` in `state`."""
+        raise NotImplementedError
+
+    def terminal(self, state):
+        """Checks if the game is over in `state`."""
+        raise NotImplementedError
+
+    def reward(self, state, player):
+        """
+        Returns the reward `player` gets on reaching `state` (only
+        asked for when `state` is terminal).
+        """
+        raise NotImplementedError
+
+    def key(self, state):
+        """Returns a compact hashable key identifying `state`."""
+        return state
+
+
+def constant(epsilon):
+    """
+    Returns an epsilon schedule that always explores with probability
+    `epsilon`.
+    """
+    return lambda episode: epsilon
+
+
+def linear(start, end, episodes):
+    """
+    Returns an epsilon schedule decreasing linearly from `start` to
+    `end` over `episodes` episodes, then staying at `end`.
+    """
+    return lambda episode: start + (end - start) * min(episode / episodes, 1)
+
+
+def exponential(start, end, decay):
+    """
+    Returns an epsilon schedule decaying from `start` towards `end` by
+    a factor of `decay` every episode.
+    """
+    return lambda episode: end + (start - end) * decay ** episode
+
+
+class Agent():
+
+    def __init__(self, game, algorithm="q-learning", alpha=0.5, gamma=1.0,
+                 epsilon=0.1, trace=0.0):
+        """
+        Initialize a tabular agent learning to play `game`.
+
+        `algorithm` is "q-learning" (off-policy: future rewards are
+        those of the best action) or "sarsa" (on-policy: those of the
+        action actually chosen). `epsilon` is an exploration rate or a
+        schedule mapping the number of episodes played to a rate (see
+        `constant`, `linear` and `exponential`). With `trace` (lambda)
+        above 0, updates are propagated back along each player's moves
+        with replacing eligibility traces (Watkins's Q(lambda) cuts
+        the traces after exploratory moves).
+
+        The Q-table maps each state key to a dictionary of the Q-values
+        of the actions tried in that state; other actions are worth 0.
+        Updates are applied online, one move at a time: batched updates
+        need a dense numbering of the states, as `train_batch` in
+        nim/my_nim.py has for Nim, and NimAI keeps its own Q-learning.
+        """
+        if algorithm not in ("q-learning", "sarsa"):
+            raise ValueError(f"unknown algorithm {algorithm}")
+        self.game = game
+        self.algorithm = algorithm
+        self.alpha = alpha
+        self.gamma = gamma
+        self.schedule = epsilon if callable(epsilon) else constant(epsilon)
+        self.trace = trace
+        self.q = dict()
+        self.episodes = 0
+
+    def get_q_value(self, key, action):
+        return self.q.get(key, {}).get(action, 0)
+
+    def best(self, key, actions):
+        """
+        Returns the best of `actions` in the state with key `key`, and
+        its Q-value.
+        """
+        values = self.q.get(key, {})
+        best_action, best_value = None, -math.inf
+        for action in actions:
+            value = values.get(action, 0)
+            if value > best_value:
+                best_action, best_value = action, value
+        return best_action, best_value
+
+    def choose(self, key, actions, epsilon):
+        """
+        Returns a random action with probability `epsilon`, or else
+        the best action.
+        """
+        if epsilon and random.random() < epsilon:
+            return random.choice(actions)
+        return self.best(key, actions)[0]
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Returns the action to take in `state`, exploring at the
+        current rate if `epsilon` is True.
+        """
+        rate = self.schedule(self.episodes) if epsilon else 0
+        key, actions = self.game.key(state), self.game.actions(state)
+        return self.choose(key, actions, rate)
+
+    def learn(self, traces, key, action, reward, future):
+        """
+        Moves the Q-value of `action` in the state with key `key`
+        towards `reward` plus the discounted `future` rewards, and
+        likewise every pair in `traces` in proportion to its trace.
+        """
+        values = self.q.setdefault(key, {})
+        delta = reward + self.gamma * future - values.get(action, 0)
+        if not self.trace:
+            values[action] = values.get(action, 0) + self.alpha * delta
+            return
+        traces[key, action] = 1.0
+        decay = self.gamma * self.trace
+        for (k, a), eligibility in list(traces.items()):
+            row = self.q.setdefault(k, {})
+            row[a] = row.get(a, 0) + self.alpha * delta * eligibility
+            if eligibility * decay < 1e-3:
+                del traces[k, a]
+            else:
+                traces[k, a] = eligibility * decay
+
+    def play_episode(self):
+        """
+        Plays one game against itself (or alone, for one player games),
+        learning from every move.
+        """
+        game = self.game
+        epsilon = self.schedule(self.episodes)
+        state = game.initial()
+
+        # Last move (key, action) and eligibility traces of each player
+        last = dict()
+        traces = [dict() for _ in range(game.players)]
+
+        while True:
+            player = game.player(state)
+            key = game.key(state)
+            actions = game.actions(state)
+            action = self.choose(key, actions, epsilon)
+
+            # The player's previous move led here, with no reward yet
+            if player in last:
+                best_action, best_value = self.best(key, actions)
+                if self.algorithm == "sarsa":
+                    future = self.get_q_value(key, action)
+                else:
+                    future = best_value
+                self.learn(traces[player], *last[player], 0, future)
+                if (self.algorithm == "q-learning"
+                        and self.get_q_value(key, action) < best_value):
+                    traces[player].clear()
+
+            last[player] = (key, action)
+            state = game.result(state, action)
+
+            # Reward every player's last move when the game ends
+            if game.terminal(state):
+                for player, (key, action) in last.items():
+                    self.learn(traces[player], key, action,
+                               game.reward(state, player), 0)
+                break
+
+        self.episodes += 1
+
+    def train(self, n):
+        """
+        Trains the agent on `n` games, returning the agent.
+        """
+        for _ in range(n):
+            self.play_episode()
+        return self
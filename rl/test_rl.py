@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from rl import Agent, Game, linear
+
+GAMMA = 0.9
+
+
+class Chain(Game):
+    """
+    A walk along cells 0 to LENGTH - 1: stepping right off the last
+    cell is rewarded with 1, stepping left off the first with 0. With
+    discount GAMMA, stepping right from cell `s` is worth
+    GAMMA ** (LENGTH - 1 - s), and stepping left GAMMA times the best
+    value of the cell on the left.
+    """
+
+    LENGTH = 5
+
+    def initial(self):
+        return self.LENGTH // 2
+
+    def actions(self, state):
+        return [-1, 1]
+
+    def result(self, state, action):
+        return state + action
+
+    def terminal(self, state):
+        return state < 0 or state >= self.LENGTH
+
+    def reward(self, state, player):
+        return 1 if state >= self.LENGTH else 0
+
+
+def optimal(s, action):
+    right = GAMMA ** (Chain.LENGTH - 1 - s)
+    if action == 1:
+        return right
+    return GAMMA * GAMMA ** (Chain.LENGTH - s) if s > 0 else 0
+
+
+def test_q_learning_finds_optimal_values():
+    # Q-learning is off-policy: even moving at random, it learns the
+    # values of the best moves
+    random.seed(0)
+    agent = Agent(Chain(), "q-learning", alpha=0.5, gamma=GAMMA, epsilon=1)
+    agent.train(2000)
+    for s in range(Chain.LENGTH):
+        for action in (-1, 1):
+            assert agent.get_q_value(s, action) == pytest.approx(optimal(s, action))
+
+
+@pytest.mark.parametrize("algorithm, trace", [
+    ("sarsa", 0), ("q-learning", 0.8), ("sarsa", 0.8)
+])
+def test_greedy_values_are_optimal(algorithm, trace):
+    # Once exploration stops, the values of the moves played from the
+    # start are those of the optimal policy
+    random.seed(0)
+    game = Chain()
+    agent = Agent(game, algorithm, alpha=0.5, gamma=GAMMA,
+                  epsilon=linear(1, 0, 500), trace=trace)
+    agent.train(2000)
+    for s in range(game.initial(), Chain.LENGTH):
+        assert agent.choose_action(s, epsilon=False) == 1
+        assert agent.get_q_value(s, 1) == pytest.approx(optimal(s, 1), abs=1e-3)
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        Agent(Chain(), "td")